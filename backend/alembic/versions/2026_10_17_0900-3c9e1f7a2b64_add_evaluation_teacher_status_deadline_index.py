@@ -0,0 +1,29 @@
+"""Add evaluation teacher/status/deadline index
+
+Revision ID: 3c9e1f7a2b64
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-17 09:00:00.000000+05:30
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9e1f7a2b64'
+down_revision = 'a1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Supports the teacher pending queue (filter + ORDER BY sla_deadline)
+    op.create_index(
+        'ix_eval_teacher_status_deadline',
+        'evaluations',
+        ['teacher_user_id', 'status', 'sla_deadline']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_eval_teacher_status_deadline', table_name='evaluations')
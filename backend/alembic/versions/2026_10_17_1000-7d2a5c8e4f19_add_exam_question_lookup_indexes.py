@@ -0,0 +1,39 @@
+"""Add question sampling and exam history indexes
+
+Revision ID: 7d2a5c8e4f19
+Revises: 3c9e1f7a2b64
+Create Date: 2026-10-17 10:00:00.000000+05:30
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2a5c8e4f19'
+down_revision = '3c9e1f7a2b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Supports per-section question sampling in exam generation
+    op.create_index(
+        'idx_questions_class_type_marks_active',
+        'questions',
+        ['class', 'question_type', 'marks'],
+        postgresql_where=sa.text("status = 'active'")
+    )
+
+    # Supports the paginated exam history (filter + ORDER BY started_at DESC)
+    op.create_index(
+        'idx_exam_instances_student_started',
+        'exam_instances',
+        ['student_user_id', sa.text('started_at DESC')]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_exam_instances_student_started', table_name='exam_instances')
+    op.drop_index('idx_questions_class_type_marks_active', table_name='questions')
@@ -0,0 +1,42 @@
+"""Add invoice_sequences table
+
+Revision ID: 5e8b1d3f7a20
+Revises: 7d2a5c8e4f19
+Create Date: 2026-10-17 11:00:00.000000+05:30
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8b1d3f7a20'
+down_revision = '7d2a5c8e4f19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'invoice_sequences',
+        sa.Column('fy_code', sa.String(10), nullable=False),
+        sa.Column('last_num', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('fy_code')
+    )
+
+    # Seed counters from invoices already issued (INV-FY2425-00001)
+    op.execute(
+        """
+        INSERT INTO invoice_sequences (fy_code, last_num)
+        SELECT split_part(invoice_number, '-', 2),
+               MAX(split_part(invoice_number, '-', 3)::bigint)
+        FROM invoices
+        WHERE invoice_number LIKE 'INV-FY%-%'
+        GROUP BY split_part(invoice_number, '-', 2)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('invoice_sequences')
@@ -0,0 +1,38 @@
+"""Convert invoice date columns to timestamptz
+
+Revision ID: 9a4c6e2b8d31
+Revises: 5e8b1d3f7a20
+Create Date: 2026-10-17 12:00:00.000000+05:30
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4c6e2b8d31'
+down_revision = '5e8b1d3f7a20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing values are naive UTC ISO strings from datetime.utcnow()
+    for column in ('invoice_date', 'created_at'):
+        op.alter_column(
+            'invoices', column,
+            type_=sa.DateTime(timezone=True),
+            postgresql_using=f"({column}::timestamp AT TIME ZONE 'UTC')",
+            server_default=sa.func.now()
+        )
+
+
+def downgrade() -> None:
+    for column in ('invoice_date', 'created_at'):
+        op.alter_column(
+            'invoices', column,
+            type_=sa.String(100),
+            postgresql_using=f"to_char({column} AT TIME ZONE 'UTC', 'YYYY-MM-DD\"T\"HH24:MI:SS.US')",
+            server_default=None
+        )
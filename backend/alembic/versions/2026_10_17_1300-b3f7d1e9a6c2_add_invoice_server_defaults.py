@@ -0,0 +1,26 @@
+"""Add server defaults for invoice id and created_at
+
+Revision ID: b3f7d1e9a6c2
+Revises: 9a4c6e2b8d31
+Create Date: 2026-10-17 13:00:00.000000+05:30
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f7d1e9a6c2'
+down_revision = '9a4c6e2b8d31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # created_at already defaults to now() since 9a4c6e2b8d31
+    op.alter_column('invoices', 'id', server_default=sa.text('gen_random_uuid()'))
+
+
+def downgrade() -> None:
+    op.alter_column('invoices', 'id', server_default=None)
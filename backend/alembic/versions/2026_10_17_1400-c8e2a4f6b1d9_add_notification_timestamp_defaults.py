@@ -0,0 +1,28 @@
+"""Add server defaults for notification timestamps
+
+Revision ID: c8e2a4f6b1d9
+Revises: b3f7d1e9a6c2
+Create Date: 2026-10-17 14:00:00.000000+05:30
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e2a4f6b1d9'
+down_revision = 'b3f7d1e9a6c2'
+branch_labels = None
+depends_on = None
+
+
+# The notification tables are created from the models (init_db) rather than
+# by an earlier revision, so only touch them where they exist
+def upgrade() -> None:
+    op.execute("ALTER TABLE IF EXISTS notifications ALTER COLUMN created_at SET DEFAULT now()")
+    op.execute("ALTER TABLE IF EXISTS notification_preferences ALTER COLUMN updated_at SET DEFAULT now()")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE IF EXISTS notification_preferences ALTER COLUMN updated_at DROP DEFAULT")
+    op.execute("ALTER TABLE IF EXISTS notifications ALTER COLUMN created_at DROP DEFAULT")
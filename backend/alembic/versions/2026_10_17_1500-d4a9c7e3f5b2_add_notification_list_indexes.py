@@ -0,0 +1,36 @@
+"""Add notification list and unread count indexes
+
+Revision ID: d4a9c7e3f5b2
+Revises: c8e2a4f6b1d9
+Create Date: 2026-10-17 15:00:00.000000+05:30
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a9c7e3f5b2'
+down_revision = 'c8e2a4f6b1d9'
+branch_labels = None
+depends_on = None
+
+
+# notifications is created from the models (init_db), so it may not exist yet
+def upgrade() -> None:
+    op.execute("""
+        DO $$
+        BEGIN
+            IF to_regclass('notifications') IS NOT NULL THEN
+                CREATE INDEX IF NOT EXISTS idx_notifications_user_created
+                    ON notifications (user_id, created_at DESC);
+                CREATE INDEX IF NOT EXISTS idx_notifications_user_unread
+                    ON notifications (user_id) WHERE is_read = false;
+            END IF;
+        END $$;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_notifications_user_unread")
+    op.execute("DROP INDEX IF EXISTS idx_notifications_user_created")
@@ -0,0 +1,33 @@
+"""Add trigram index for question text search
+
+Revision ID: e6b2d8f4a1c7
+Revises: d4a9c7e3f5b2
+Create Date: 2026-10-17 16:00:00.000000+05:30
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b2d8f4a1c7'
+down_revision = 'd4a9c7e3f5b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Lets the question search's ILIKE '%term%' use an index instead of
+    # scanning every question
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'idx_questions_text_trgm',
+        'questions',
+        ['question_text'],
+        postgresql_using='gin',
+        postgresql_ops={'question_text': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_questions_text_trgm', table_name='questions')
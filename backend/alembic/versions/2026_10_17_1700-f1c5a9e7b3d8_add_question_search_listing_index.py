@@ -0,0 +1,31 @@
+"""Add class/unit listing index for question search
+
+Revision ID: f1c5a9e7b3d8
+Revises: e6b2d8f4a1c7
+Create Date: 2026-10-17 17:00:00.000000+05:30
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c5a9e7b3d8'
+down_revision = 'e6b2d8f4a1c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Supports the question bank listing (filter by class and unit,
+    # ORDER BY created_at DESC) without sorting the matches
+    op.create_index(
+        'idx_questions_class_unit_created',
+        'questions',
+        ['class', 'unit', sa.text('created_at DESC')]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_questions_class_unit_created', table_name='questions')
@@ -6,18 +6,44 @@ using SQLAlchemy async for PostgreSQL.
 """
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy import text
 from sqlalchemy.orm import declarative_base
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
+import orjson
 
 from config.settings import settings
 
-# Create async engine
+
+def _json_serializer(value: Any) -> str:
+    """Serialize JSON/JSONB column values with orjson"""
+    # OPT_NON_STR_KEYS keeps parity with json.dumps for int-keyed dicts
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _async_database_url(url: str) -> str:
+    """Point plain/psycopg2 PostgreSQL URLs at the native asyncpg driver"""
+    # Hosting providers hand out postgres:// or postgresql:// URLs; without
+    # an explicit driver SQLAlchemy would pick psycopg2
+    scheme, sep, rest = url.partition("://")
+    if scheme in ("postgres", "postgresql", "postgresql+psycopg2"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return url
+
+
+# Create async engine (asyncpg; async engines default to AsyncAdaptedQueuePool)
 engine = create_async_engine(
-    settings.DATABASE_URL,
+    _async_database_url(settings.DATABASE_URL),
     echo=settings.DEBUG,  # Log SQL queries in debug mode
-    pool_size=20,
-    max_overflow=40,
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
     pool_pre_ping=True,  # Verify connections before using
+    # Search endpoints build many filter combinations; keep their compiled
+    # SQL cached instead of recompiling once the default 500 slots fill up
+    query_cache_size=1200,
+    # JSONB columns such as exam_snapshot can be large; orjson parses them
+    # several times faster than the stdlib json module
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
 )
 
 # Session factory
@@ -55,6 +81,8 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
 async def init_db():
     """Initialize database - create all tables"""
     async with engine.begin() as conn:
+        # idx_questions_text_trgm uses the gin_trgm_ops operator class
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
 
 
@@ -60,7 +60,7 @@ from models.promo_code import PromoCode, PromoCodeUsage, PromoType
 
 # Payment System
 from models.payment import Payment, PaymentStatus, PaymentMethod
-from models.invoice import Invoice
+from models.invoice import Invoice, InvoiceSequence
 from models.discount_code import DiscountCode, DiscountType
 from models.discount_code_usage import DiscountCodeUsage
 
@@ -113,6 +113,7 @@ __all__ = [
     "PaymentStatus",
     "PaymentMethod",
     "Invoice",
+    "InvoiceSequence",
     "DiscountCode",
     "DiscountType",
     "DiscountCodeUsage",
@@ -6,9 +6,11 @@ Teacher evaluation with SLA tracking:
 - QuestionMark: Granular marks per question for analytics
 """
 
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, CheckConstraint, UniqueConstraint, Text, Numeric, TypeDecorator
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, CheckConstraint, UniqueConstraint, Index, Text, Numeric, TypeDecorator
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy import and_, func
 from datetime import datetime, timezone
 import uuid
 
@@ -96,6 +98,8 @@ class Evaluation(Base):
             'total_manual_marks IS NULL OR total_manual_marks >= 0',
             name='mv_valid_total_manual_marks'
         ),
+        # Teacher pending queue: filter by teacher/status, ordered by deadline
+        Index('ix_eval_teacher_status_deadline', 'teacher_user_id', 'status', 'sla_deadline'),
         # Note: We can't enforce the completion constraint in PostgreSQL directly
         # as it would require checking enum values. This will be enforced at application level.
     )
@@ -131,6 +135,18 @@ class Evaluation(Base):
             return False
         return datetime.now(timezone.utc) > self.sla_deadline
 
+    @hybrid_property
+    def overdue(self) -> bool:
+        """Overdue flag usable both on instances and in SQL filters"""
+        return self.is_overdue()
+
+    @overdue.expression
+    def overdue(cls):
+        return and_(
+            cls.status != EvaluationStatus.COMPLETED.value,
+            cls.sla_deadline < func.now()
+        )
+
 
 class QuestionMark(Base):
     """Granular marks per question for analytics and display"""
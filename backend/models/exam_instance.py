@@ -8,7 +8,7 @@ Individual exam attempts with:
 - UnansweredQuestion: Student-declared unanswered questions
 """
 
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, CheckConstraint, BigInteger, Text, UniqueConstraint, Numeric, TypeDecorator
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, CheckConstraint, BigInteger, Text, UniqueConstraint, Index, Numeric, TypeDecorator, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
@@ -104,6 +104,7 @@ class ExamInstance(Base):
         CheckConstraint('mcq_score >= 0', name='mv_valid_mcq_score'),
         CheckConstraint('manual_score >= 0', name='mv_valid_manual_score'),
         CheckConstraint('total_score >= 0', name='mv_valid_total_score'),
+        Index('idx_exam_instances_student_started', 'student_user_id', text('started_at DESC')),
     )
 
     # Relationships
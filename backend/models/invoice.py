@@ -4,12 +4,12 @@ Invoice Model
 Generates and stores invoices with GST breakdown.
 """
 
-from sqlalchemy import Column, String, Numeric, Text, ForeignKey, Index
+from sqlalchemy import Column, String, Numeric, Text, ForeignKey, Index, BigInteger, DateTime, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from database import Base
+from datetime import datetime, timezone
 import uuid
-from datetime import datetime
 
 
 class Invoice(Base):
@@ -21,7 +21,20 @@ class Invoice(Base):
     """
     __tablename__ = "invoices"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # created_at comes from the database; fetch it with the INSERT's RETURNING
+    __mapper_args__ = {"eager_defaults": True}
+
+    # The client-side uuid4 makes id an insertmanyvalues sentinel, so
+    # create_invoices_bulk's ordered RETURNING stays one batched INSERT
+    # (insert_sentinel is needed because a server default alone disqualifies
+    # the column). The server default covers rows inserted outside the ORM.
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+        insert_sentinel=True
+    )
 
     # Invoice number (sequential, formatted)
     invoice_number = Column(String(50), unique=True, nullable=False, index=True)  # INV-FY2425-00001
@@ -32,7 +45,7 @@ class Invoice(Base):
     subscription_id = Column(UUID(as_uuid=True), ForeignKey("subscriptions.subscription_id"))
 
     # Invoice details
-    invoice_date = Column(String(100), nullable=False, default=lambda: datetime.utcnow().isoformat())
+    invoice_date = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc), server_default=func.now())
 
     # Customer details (snapshot at time of invoice)
     customer_name = Column(String(200), nullable=False)
@@ -76,7 +89,7 @@ class Invoice(Base):
     pdf_url = Column(String(500))  # S3 URL if we store PDFs
 
     # Metadata
-    created_at = Column(String(100), default=lambda: datetime.utcnow().isoformat())
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     user = relationship("User", backref="invoices")
@@ -87,3 +100,19 @@ class Invoice(Base):
 
 # Index for invoice lookup
 Index('idx_invoice_user_date', Invoice.user_id, Invoice.invoice_date.desc())
+
+
+class InvoiceSequence(Base):
+    """
+    Per financial year invoice counter.
+
+    Incremented with UPDATE ... RETURNING so concurrent invoices get
+    distinct, gap-free numbers without scanning existing invoices.
+    """
+    __tablename__ = "invoice_sequences"
+
+    fy_code = Column(String(10), primary_key=True)  # FY2425
+    last_num = Column(BigInteger, nullable=False, default=0)  # Last issued number
+
+    def __repr__(self):
+        return f"<InvoiceSequence {self.fy_code} - {self.last_num}>"
@@ -6,10 +6,9 @@ Models for notification system:
 - NotificationPreference: User preferences for notification channels
 """
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Text, TypeDecorator
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Text, TypeDecorator, Index, func, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
 from sqlalchemy.orm import relationship
-from datetime import datetime, timezone
 import uuid
 
 from database import Base
@@ -37,6 +36,9 @@ class Notification(Base):
 
     __tablename__ = "notifications"
 
+    # Server-set timestamps come back with the INSERT's RETURNING
+    __mapper_args__ = {"eager_defaults": True}
+
     # Primary Key
     notification_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
@@ -83,10 +85,17 @@ class Notification(Base):
     extra_data = Column(JSONB)
 
     # Timestamps
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     sent_at = Column(DateTime(timezone=True))
     expires_at = Column(DateTime(timezone=True))  # Auto-delete after this date
 
+    __table_args__ = (
+        # Newest-first notification list per user
+        Index('idx_notifications_user_created', 'user_id', text('created_at DESC')),
+        # Unread badge count
+        Index('idx_notifications_user_unread', 'user_id', postgresql_where=text('is_read = false')),
+    )
+
     # Relationships
     user = relationship("User", back_populates="notifications")
 
@@ -119,6 +128,9 @@ class NotificationPreference(Base):
 
     __tablename__ = "notification_preferences"
 
+    # Server-set timestamps come back with the INSERT/UPDATE's RETURNING
+    __mapper_args__ = {"eager_defaults": True}
+
     # Primary Key
     preference_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
@@ -144,7 +156,7 @@ class NotificationPreference(Base):
     weekly_digest = Column(Boolean, default=False, nullable=False)
 
     # Audit
-    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="notification_preferences")
@@ -55,7 +55,7 @@ class Payment(Base):
     razorpay_signature = Column(String(200))  # Signature for verification
 
     # Payment details
-    amount_inr = Column(Numeric(10, 2), nullable=False)  # Amount charged (with GST)
+    amount_inr = Column(Numeric(10, 2, asdecimal=True), nullable=False)  # Amount charged (with GST)
     currency = Column(String(3), default="INR", nullable=False)
     status = Column(String(20), nullable=False, default=PaymentStatus.CREATED.value, index=True)
 
@@ -65,10 +65,10 @@ class Payment(Base):
 
     # Discount tracking
     discount_code = Column(String(50), index=True)
-    discount_amount_inr = Column(Numeric(10, 2), default=0)
+    discount_amount_inr = Column(Numeric(10, 2, asdecimal=True), default=0)
 
     # GST breakdown (calculated at payment time)
-    base_amount_inr = Column(Numeric(10, 2))  # Amount before GST
+    base_amount_inr = Column(Numeric(10, 2, asdecimal=True))  # Amount before GST
     gst_amount_inr = Column(Numeric(10, 2))  # Total GST (CGST + SGST or IGST)
     cgst_inr = Column(Numeric(10, 2))  # Central GST (9%)
     sgst_inr = Column(Numeric(10, 2))  # State GST (9%)
@@ -4,7 +4,7 @@ Question Model
 Question bank with versioning, multi-format support, and CBSE unit tagging.
 """
 
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ForeignKey, CheckConstraint, TypeDecorator
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ForeignKey, CheckConstraint, Index, TypeDecorator, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
@@ -113,6 +113,22 @@ class Question(Base):
             'cbse_year IS NULL OR (cbse_year >= 2000 AND cbse_year <= 2100)',
             name='mv_valid_cbse_year'
         ),
+        Index(
+            'idx_questions_class_type_marks_active',
+            'class', 'question_type', 'marks',
+            postgresql_where=text("status = 'active'")
+        ),
+        # Needs the pg_trgm extension (created by the migration and init_db)
+        Index(
+            'idx_questions_text_trgm',
+            'question_text',
+            postgresql_using='gin',
+            postgresql_ops={'question_text': 'gin_trgm_ops'}
+        ),
+        Index(
+            'idx_questions_class_unit_created',
+            'class', 'unit', text('created_at DESC')
+        ),
     )
 
     # Relationships
@@ -66,19 +66,7 @@ async def get_available_templates(
         current_user.student_class
     )
 
-    template_responses = [
-        ExamTemplateResponse(
-            template_id=str(t.template_id),
-            template_name=t.template_name,
-            exam_type=t.exam_type,
-            class_level=t.class_level,
-            total_marks=t.get_total_marks(),
-            duration_minutes=t.get_duration_minutes(),
-            section_config=t.config,
-            is_active=t.is_active
-        )
-        for t in templates
-    ]
+    template_responses = [ExamTemplateResponse(**t) for t in templates]
 
     return {
         "templates": template_responses,
@@ -302,7 +290,7 @@ async def get_exam_results(
     # Get exam snapshot with question IDs and answers
     snapshot = exam.exam_snapshot or {}
     question_ids = snapshot.get('question_ids', [])
-    student_answers = snapshot.get('student_answers', {})
+    student_answers = await exam_service.get_saved_answers(session, exam)
 
     # Load questions
     questions = []
@@ -557,14 +545,12 @@ async def get_exam_history(
         if exam.total_score and exam.total_marks:
             percentage = round((exam.total_score / exam.total_marks) * 100, 2)
 
-        # Extract question_type and selected_units from exam_snapshot for unit practice exams
+        # question_type and selected_units only apply to unit practice exams
         question_type = None
         selected_units = None
-        if exam.exam_type == 'unit_practice' and exam.exam_snapshot:
-            snapshot = exam.exam_snapshot
-            # Fields are stored directly in snapshot, not in template_config
-            question_type = snapshot.get('question_type')
-            selected_units = snapshot.get('selected_units', [])
+        if exam.exam_type == 'unit_practice':
+            question_type = exam.question_type
+            selected_units = exam.selected_units or []
 
         history_responses.append(ExamHistoryResponse(
             exam_instance_id=str(exam.exam_instance_id),
@@ -96,7 +96,7 @@ async def generate_invoice(
     return InvoiceResponse(
         invoice_id=str(invoice.id),
         invoice_number=invoice.invoice_number,
-        invoice_date=invoice.invoice_date,
+        invoice_date=invoice.invoice_date.isoformat(),
         customer_name=invoice.customer_name,
         customer_email=invoice.customer_email,
         item_description=invoice.item_description,
@@ -150,7 +150,7 @@ async def get_invoice(
     return InvoiceResponse(
         invoice_id=str(invoice.id),
         invoice_number=invoice.invoice_number,
-        invoice_date=invoice.invoice_date,
+        invoice_date=invoice.invoice_date.isoformat(),
         customer_name=invoice.customer_name,
         customer_email=invoice.customer_email,
         item_description=invoice.item_description,
@@ -239,7 +239,7 @@ async def get_user_invoices(
         InvoiceResponse(
             invoice_id=str(inv.id),
             invoice_number=inv.invoice_number,
-            invoice_date=inv.invoice_date,
+            invoice_date=inv.invoice_date.isoformat(),
             customer_name=inv.customer_name,
             customer_email=inv.customer_email,
             item_description=inv.item_description,
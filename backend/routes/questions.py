@@ -297,7 +297,8 @@ async def search_questions(
         session,
         filter_dict,
         page,
-        page_size
+        page_size,
+        summary_only=True
     )
 
     total_pages = math.ceil(total / page_size) if total > 0 else 0
@@ -22,6 +22,7 @@ from schemas.teacher import (
     StudentExamListItem,
     TeacherStudentStats,
 )
+from services import exam_service
 
 logger = logging.getLogger(__name__)
 
@@ -351,7 +352,7 @@ async def get_student_exam_results(
     # Get exam snapshot with question IDs and answers
     snapshot = exam.exam_snapshot or {}
     question_ids = snapshot.get('question_ids', [])
-    student_answers = snapshot.get('student_answers', {})
+    student_answers = await exam_service.get_saved_answers(session, exam)
 
     # Load questions
     questions = []
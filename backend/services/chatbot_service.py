@@ -11,9 +11,16 @@ intelligent responses for complex questions.
 
 import re
 import logging
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Tuple, Sequence
 from difflib import SequenceMatcher
 
+# Optional: this module is the fallback when the RAG chatbot (which needs
+# numpy) can't be imported, so it must work without numpy too
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -268,18 +275,83 @@ def calculate_similarity(text1: str, text2: str) -> float:
     return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
 
 
+# ============================================
+# Keyword Matrix
+# ============================================
+
+# FAQ x keyword-vocabulary incidence matrix, built once at import. Keyword
+# counts for every FAQ are then a single matrix-vector product against the
+# user's keyword presence vector. Without numpy, the same counts come from
+# per-FAQ keyword sets.
+_VOCAB: List[str] = sorted({k.lower() for faq in FAQ_DATABASE for k in faq["keywords"]})
+_VOCAB_INDEX: Dict[str, int] = {keyword: i for i, keyword in enumerate(_VOCAB)}
+_FAQ_KEYWORD_SETS: List[frozenset] = [
+    frozenset(k.lower() for k in faq["keywords"]) for faq in FAQ_DATABASE
+]
+if np is not None:
+    _FAQ_KW_MATRIX = np.zeros((len(FAQ_DATABASE), len(_VOCAB)), dtype=np.int32)
+    for _row, _keywords in enumerate(_FAQ_KEYWORD_SETS):
+        for _keyword in _keywords:
+            _FAQ_KW_MATRIX[_row, _VOCAB_INDEX[_keyword]] = 1
+
+
+def _keyword_match_counts(user_message_lower: str) -> Sequence[int]:
+    """Return the number of keywords each FAQ has present in the message."""
+    if np is None:
+        present = {keyword for keyword in _VOCAB if keyword in user_message_lower}
+        return [len(keywords & present) for keywords in _FAQ_KEYWORD_SETS]
+
+    user_vec = np.fromiter(
+        (keyword in user_message_lower for keyword in _VOCAB),
+        dtype=np.int32,
+        count=len(_VOCAB),
+    )
+    return _FAQ_KW_MATRIX @ user_vec
+
+
+# ============================================
+# Hit-Frequency Ordering
+# ============================================
+
+# A handful of FAQs (pricing, getting started) dominate real traffic. We keep
+# a per-FAQ hit counter and periodically re-sort the evaluation order so the
+# popular entries are scored first and the loop can exit on a strong match.
+_REORDER_INTERVAL = 50
+_hit_counts: List[int] = [0] * len(FAQ_DATABASE)
+_faq_order: List[int] = list(range(len(FAQ_DATABASE)))
+_calls_since_reorder = 0
+
+
+def _record_hit(faq_index: int) -> None:
+    """Record a successful match and periodically refresh the FAQ order."""
+    global _faq_order, _calls_since_reorder
+
+    _hit_counts[faq_index] += 1
+    _calls_since_reorder += 1
+    if _calls_since_reorder >= _REORDER_INTERVAL:
+        # sorted() is stable, so ties keep the original FAQ_DATABASE order
+        _faq_order = sorted(range(len(FAQ_DATABASE)), key=lambda i: -_hit_counts[i])
+        _calls_since_reorder = 0
+
+
 def find_matching_faq(user_message: str) -> Tuple[Optional[Dict], float]:
     """
     Find the best matching FAQ for a user message.
 
+    FAQs are evaluated most-hit first; scanning stops as soon as a match
+    reaches pattern-level confidence (0.9).
+
     Returns:
         Tuple of (matching_faq, confidence_score)
     """
     user_message_lower = user_message.lower().strip()
     best_match = None
+    best_index = -1
     best_score = 0.0
+    keyword_counts = _keyword_match_counts(user_message_lower)
 
-    for faq in FAQ_DATABASE:
+    for index in _faq_order:
+        faq = FAQ_DATABASE[index]
         score = 0.0
 
         # Check pattern matches (highest priority)
@@ -289,22 +361,27 @@ def find_matching_faq(user_message: str) -> Tuple[Optional[Dict], float]:
                 break
 
         # Check keyword matches
-        keyword_matches = sum(
-            1 for keyword in faq["keywords"]
-            if keyword.lower() in user_message_lower
-        )
+        keyword_matches = int(keyword_counts[index])
         if keyword_matches > 0:
             keyword_score = min(0.7, 0.3 + (keyword_matches * 0.15))
             score = max(score, keyword_score)
 
-        # Check question similarity
-        question_similarity = calculate_similarity(user_message, faq["question"])
-        if question_similarity > 0.5:
-            score = max(score, question_similarity)
+        # Check question similarity (skipped once pattern-level confidence is reached)
+        if score < 0.9:
+            question_similarity = calculate_similarity(user_message, faq["question"])
+            if question_similarity > 0.5:
+                score = max(score, question_similarity)
 
         if score > best_score:
             best_score = score
             best_match = faq
+            best_index = index
+
+        if best_score >= 0.9:
+            break
+
+    if best_match is not None and best_score >= 0.5:
+        _record_hit(best_index)
 
     return best_match, best_score
 
@@ -5,16 +5,164 @@ Business logic for teacher evaluation workflow.
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, update
+from sqlalchemy import select, insert, and_, or_, func, update, bindparam, cast
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import List, Optional, Tuple, Dict
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
+from collections import OrderedDict
 import uuid
 
 from models import Evaluation, QuestionMark, ExamInstance, User
 from models.enums import EvaluationStatus, ExamStatus, QuestionType
 
 
+# Question types that require teacher (manual) evaluation
+MANUAL_QUESTION_TYPES = frozenset((
+    QuestionType.VSA.value,
+    QuestionType.SA.value,
+    QuestionType.LA.value,
+))
+
+_HOURS_PER_WEEK = 7 * 24
+_WORKING_HOURS_PER_WEEK = 6 * 24  # Monday-Saturday
+
+
+def _working_hours_through(hour_index: int) -> int:
+    """Count non-Sunday hour indices in [0, hour_index]."""
+    weeks, hour_of_week = divmod(hour_index, _HOURS_PER_WEEK)
+    return weeks * _WORKING_HOURS_PER_WEEK + min(hour_of_week, _WORKING_HOURS_PER_WEEK - 1) + 1
+
+
+def _hour_index_for_working_hours(count: int) -> int:
+    """Smallest hour index whose working-hour count reaches ``count`` (count >= 1)."""
+    weeks, hour_of_week = divmod(count - 1, _WORKING_HOURS_PER_WEEK)
+    return weeks * _HOURS_PER_WEEK + hour_of_week
+
+
+# Parsed exam_snapshot questions, keyed by exam_instance_id. The question list
+# is fixed when the exam is generated, so entries never need invalidating.
+_SNAPSHOT_CACHE_SIZE = 1024
+_snapshot_cache: "OrderedDict[str, Tuple[Dict[int, dict], List[dict], int]]" = OrderedDict()
+
+
+def _parse_snapshot(exam: ExamInstance) -> Tuple[Dict[int, dict], List[dict], int]:
+    """
+    Return (question_map, manual_questions, total_possible_marks) for an exam
+
+    Results are memoized per exam instance in a bounded LRU cache; callers
+    must treat the returned structures as read-only.
+    """
+    key = str(exam.exam_instance_id)
+    parsed = _snapshot_cache.get(key)
+    if parsed is not None:
+        _snapshot_cache.move_to_end(key)
+        return parsed
+
+    questions_snapshot = exam.exam_snapshot.get('questions', [])
+    question_map = {q['question_number']: q for q in questions_snapshot}
+    manual_questions = [
+        q for q in questions_snapshot
+        if q['question_type'] in MANUAL_QUESTION_TYPES
+    ]
+    total_possible_marks = sum(q['marks'] for q in manual_questions)
+
+    parsed = (question_map, manual_questions, total_possible_marks)
+    _snapshot_cache[key] = parsed
+    if len(_snapshot_cache) > _SNAPSHOT_CACHE_SIZE:
+        _snapshot_cache.popitem(last=False)
+    return parsed
+
+
+# ============================================
+# Prebuilt Statements
+# ============================================
+
+# Hot statements are built once at import and executed with bound parameters,
+# so each call skips statement construction and hits the compiled cache.
+_EVALUATION_WITH_EXAM_STMT = (
+    select(Evaluation, ExamInstance)
+    .join(ExamInstance, Evaluation.exam_instance_id == ExamInstance.exam_instance_id)
+    .where(Evaluation.evaluation_id == bindparam('evaluation_id'))
+)
+
+_EVALUATION_BY_EXAM_STMT = select(Evaluation).where(
+    Evaluation.exam_instance_id == bindparam('exam_instance_id')
+)
+
+_MARKS_BY_QUESTION_NUMBERS_STMT = select(QuestionMark).where(
+    and_(
+        QuestionMark.evaluation_id == bindparam('evaluation_id'),
+        QuestionMark.question_number.in_(bindparam('question_numbers', expanding=True))
+    )
+)
+
+_MARKS_TOTAL_STMT = select(
+    func.count(QuestionMark.mark_id),
+    func.coalesce(func.sum(QuestionMark.marks_awarded), 0)
+).where(
+    QuestionMark.evaluation_id == bindparam('evaluation_id')
+)
+
+_MARKS_FOR_EVALUATION_STMT = select(QuestionMark).where(
+    QuestionMark.evaluation_id == bindparam('evaluation_id')
+).order_by(QuestionMark.question_number)
+
+_PENDING_FILTER = and_(
+    Evaluation.teacher_user_id == bindparam('teacher_user_id'),
+    Evaluation.status.in_([
+        EvaluationStatus.ASSIGNED.value,
+        EvaluationStatus.IN_PROGRESS.value
+    ])
+)
+
+_PENDING_PAGE_STMT = (
+    select(Evaluation, func.count().over().label('total'))
+    .where(_PENDING_FILTER)
+    .order_by(Evaluation.sla_deadline.asc())
+    .limit(bindparam('limit'))
+    .offset(bindparam('offset'))
+)
+
+_PENDING_COUNT_STMT = select(func.count()).select_from(Evaluation).where(_PENDING_FILTER)
+
+
+async def _get_evaluation_with_exam(
+    session: AsyncSession,
+    evaluation_id: str
+) -> Tuple[Evaluation, ExamInstance]:
+    """Fetch an evaluation and its exam instance in a single joined query."""
+    result = await session.execute(
+        _EVALUATION_WITH_EXAM_STMT, {'evaluation_id': evaluation_id}
+    )
+    row = result.one_or_none()
+    if not row:
+        raise ValueError("Evaluation not found")
+    evaluation, exam = row[0], row[1]
+    session.info.setdefault('_exam_cache', {})[str(exam.exam_instance_id)] = exam
+    return evaluation, exam
+
+
+async def _get_exam_cached(
+    session: AsyncSession,
+    exam_instance_id: str
+) -> Optional[ExamInstance]:
+    """
+    Get an exam instance, memoized for the lifetime of the session
+
+    exam_snapshot is write-once, so the instance can be reused across calls
+    made with the same request-scoped session.
+    """
+    cache = session.info.setdefault('_exam_cache', {})
+    exam = cache.get(exam_instance_id)
+    if exam is None:
+        exam = await session.get(ExamInstance, exam_instance_id)
+        if exam is not None:
+            cache[exam_instance_id] = exam
+    return exam
+
+
 class EvaluationService:
     """Service for teacher evaluation operations"""
 
@@ -35,20 +183,22 @@ class EvaluationService:
         Returns:
             SLA deadline datetime
         """
-        current = assigned_at
-        hours_remaining = sla_hours
+        if not exclude_sundays:
+            return assigned_at + timedelta(hours=sla_hours)
 
-        while hours_remaining > 0:
-            # Move forward by 1 hour
-            current = current + timedelta(hours=1)
+        # No hours to step (the closed form below would land on the end of
+        # the previous working hour, i.e. before a Sunday assignment)
+        if sla_hours <= 0:
+            return assigned_at
 
-            # Skip Sundays if enabled
-            if exclude_sundays and current.weekday() == 6:  # Sunday
-                continue
+        # Work in whole-hour indices within the week (Monday 00:00 = 0).
+        # Every step lands on the same minute/second offset, so an hour
+        # step falls on a Sunday exactly when its index mod 168 >= 144.
+        start_index = assigned_at.weekday() * 24 + assigned_at.hour
+        target = _working_hours_through(start_index) + sla_hours
+        elapsed_hours = _hour_index_for_working_hours(target) - start_index
 
-            hours_remaining -= 1
-
-        return current
+        return assigned_at + timedelta(hours=elapsed_hours)
 
     @staticmethod
     async def assign_evaluation(
@@ -84,7 +234,7 @@ class EvaluationService:
 
         # Check if evaluation already exists
         existing = await session.execute(
-            select(Evaluation).where(Evaluation.exam_instance_id == exam_instance_id)
+            _EVALUATION_BY_EXAM_STMT, {'exam_instance_id': exam_instance_id}
         )
         if existing.scalar_one_or_none():
             raise ValueError("Evaluation already assigned for this exam")
@@ -133,23 +283,35 @@ class EvaluationService:
         Returns:
             Updated Evaluation
         """
-        evaluation = await session.get(Evaluation, evaluation_id)
-        if not evaluation:
-            raise ValueError("Evaluation not found")
-
-        # Verify teacher ownership
-        if str(evaluation.teacher_user_id) != teacher_user_id:
-            raise ValueError("Evaluation assigned to different teacher")
+        # Ownership and state are checked by the UPDATE's WHERE clause, so
+        # the happy path is a single round-trip with no race window
+        result = await session.execute(
+            update(Evaluation)
+            .where(
+                and_(
+                    Evaluation.evaluation_id == evaluation_id,
+                    Evaluation.teacher_user_id == teacher_user_id,
+                    Evaluation.status == EvaluationStatus.ASSIGNED.value
+                )
+            )
+            .values(
+                status=EvaluationStatus.IN_PROGRESS.value,
+                started_at=datetime.now(timezone.utc)
+            )
+            .returning(Evaluation)
+        )
+        evaluation = result.scalar_one_or_none()
 
-        if evaluation.status != EvaluationStatus.ASSIGNED.value:
+        if not evaluation:
+            # Nothing updated; look the row up only to report why
+            existing = await session.get(Evaluation, evaluation_id)
+            if not existing:
+                raise ValueError("Evaluation not found")
+            if str(existing.teacher_user_id) != teacher_user_id:
+                raise ValueError("Evaluation assigned to different teacher")
             raise ValueError("Evaluation already started or completed")
 
-        # Update status
-        evaluation.status = EvaluationStatus.IN_PROGRESS.value
-        evaluation.started_at = datetime.now(timezone.utc)
-
         await session.commit()
-        await session.refresh(evaluation)
 
         return evaluation
 
@@ -174,6 +336,8 @@ class EvaluationService:
         Returns:
             Tuple of (Updated Evaluation, List of QuestionMark objects)
         """
+        now = datetime.now(timezone.utc)
+
         evaluation = await session.get(Evaluation, evaluation_id)
         if not evaluation:
             raise ValueError("Evaluation not found")
@@ -188,17 +352,30 @@ class EvaluationService:
         # Start evaluation if not started
         if evaluation.status == EvaluationStatus.ASSIGNED.value:
             evaluation.status = EvaluationStatus.IN_PROGRESS.value
-            evaluation.started_at = datetime.now(timezone.utc)
+            evaluation.started_at = now
 
         # Get exam instance for question details
-        exam = await session.get(ExamInstance, str(evaluation.exam_instance_id))
+        exam = await _get_exam_cached(session, str(evaluation.exam_instance_id))
         if not exam:
             raise ValueError("Exam instance not found")
 
-        questions_snapshot = exam.exam_snapshot.get('questions', [])
-        question_map = {q['question_number']: q for q in questions_snapshot}
+        question_map, _, _ = _parse_snapshot(exam)
+
+        # Load any marks already recorded for these questions in one query
+        question_numbers = [m['question_number'] for m in marks_data]
+        existing_result = await session.execute(
+            _MARKS_BY_QUESTION_NUMBERS_STMT,
+            {'evaluation_id': evaluation_id, 'question_numbers': question_numbers}
+        )
+        existing_by_number = {
+            mark.question_number: mark for mark in existing_result.scalars().all()
+        }
 
         created_marks = []
+        # New rows are inserted together after the loop; remember where each
+        # belongs so the returned list keeps the submitted order
+        new_rows = []
+        new_positions = []
 
         for mark_data in marks_data:
             question_number = mark_data['question_number']
@@ -219,15 +396,7 @@ class EvaluationService:
                 )
 
             # Check if marks already exist for this question
-            existing = await session.execute(
-                select(QuestionMark).where(
-                    and_(
-                        QuestionMark.evaluation_id == evaluation_id,
-                        QuestionMark.question_number == question_number
-                    )
-                )
-            )
-            existing_mark = existing.scalar_one_or_none()
+            existing_mark = existing_by_number.get(question_number)
 
             if existing_mark:
                 # Update existing
@@ -236,38 +405,55 @@ class EvaluationService:
                 created_marks.append(existing_mark)
             else:
                 # Create new
-                question_mark = QuestionMark(
-                    evaluation_id=evaluation_id,
-                    exam_instance_id=str(evaluation.exam_instance_id),
-                    question_number=question_number,
-                    question_id=question_info['question_id'],
-                    question_type=question_info['question_type'],
-                    unit=question_info.get('question_content', {}).get('unit'),
-                    marks_awarded=marks_awarded,
-                    marks_possible=marks_possible,
-                    teacher_comment=mark_data.get('teacher_comment')
-                )
-                session.add(question_mark)
-                created_marks.append(question_mark)
+                new_positions.append(len(created_marks))
+                created_marks.append(None)
+                new_rows.append({
+                    'evaluation_id': evaluation_id,
+                    'exam_instance_id': str(evaluation.exam_instance_id),
+                    'question_number': question_number,
+                    'question_id': question_info['question_id'],
+                    'question_type': question_info['question_type'],
+                    'unit': question_info.get('question_content', {}).get('unit'),
+                    'marks_awarded': marks_awarded,
+                    'marks_possible': marks_possible,
+                    'teacher_comment': mark_data.get('teacher_comment')
+                })
+
+        if new_rows:
+            # One multi-row INSERT ... RETURNING for all new marks
+            inserted = await session.execute(
+                insert(QuestionMark).returning(QuestionMark, sort_by_parameter_order=True),
+                new_rows
+            )
+            for position, question_mark in zip(new_positions, inserted.scalars().all()):
+                created_marks[position] = question_mark
 
-        # Update annotation data if provided
+        # Merge annotation data if provided. Postgres performs the top-level
+        # JSONB merge atomically, so concurrent submits don't lose keys.
         if annotation_data:
-            if evaluation.annotation_data:
-                # Merge with existing
-                existing_annotations = evaluation.annotation_data
-                existing_annotations.update(annotation_data)
-                evaluation.annotation_data = existing_annotations
-            else:
-                evaluation.annotation_data = annotation_data
+            merged = await session.scalar(
+                update(Evaluation)
+                .where(Evaluation.evaluation_id == evaluation_id)
+                .values(
+                    annotation_data=func.coalesce(
+                        Evaluation.annotation_data, cast({}, JSONB)
+                    ).op('||')(cast(annotation_data, JSONB))
+                )
+                .returning(Evaluation.annotation_data)
+                .execution_options(synchronize_session=False)
+            )
+            # Load the merged value as already persisted: assigning it would
+            # write the whole document back at flush, and leaving the
+            # attribute expired would lazy-load (not allowed under asyncio)
+            # when the route serializes the evaluation
+            set_committed_value(evaluation, 'annotation_data', merged)
 
-        evaluation.updated_at = datetime.now(timezone.utc)
+        evaluation.updated_at = now
 
+        # mark_id and created_at are client-side defaults populated at flush,
+        # so neither the marks nor the evaluation need a refresh after commit
         await session.commit()
 
-        for mark in created_marks:
-            await session.refresh(mark)
-        await session.refresh(evaluation)
-
         return evaluation, created_marks
 
     @staticmethod
@@ -287,9 +473,7 @@ class EvaluationService:
         Returns:
             Completed Evaluation
         """
-        evaluation = await session.get(Evaluation, evaluation_id)
-        if not evaluation:
-            raise ValueError("Evaluation not found")
+        evaluation, exam = await _get_evaluation_with_exam(session, evaluation_id)
 
         # Verify teacher ownership
         if str(evaluation.teacher_user_id) != teacher_user_id:
@@ -298,56 +482,42 @@ class EvaluationService:
         if evaluation.status == EvaluationStatus.COMPLETED.value:
             raise ValueError("Evaluation already completed")
 
-        # Get exam instance
-        exam = await session.get(ExamInstance, str(evaluation.exam_instance_id))
-        if not exam:
-            raise ValueError("Exam instance not found")
-
-        # Get all question marks for this evaluation
+        # Count and total the question marks in SQL
         marks_result = await session.execute(
-            select(QuestionMark).where(
-                QuestionMark.evaluation_id == evaluation_id
-            )
+            _MARKS_TOTAL_STMT, {'evaluation_id': evaluation_id}
         )
-        question_marks = marks_result.scalars().all()
+        marks_count, total_manual = marks_result.one()
 
         # Get total questions requiring manual evaluation
-        questions_snapshot = exam.exam_snapshot.get('questions', [])
-        manual_questions = [
-            q for q in questions_snapshot
-            if q['question_type'] in ['VSA', 'SA', 'LA']
-        ]
+        _, manual_questions, _ = _parse_snapshot(exam)
 
         # Verify all manual questions are evaluated
-        if len(question_marks) < len(manual_questions):
+        if marks_count < len(manual_questions):
             raise ValueError(
                 f"Not all questions evaluated. "
-                f"Expected {len(manual_questions)}, got {len(question_marks)}"
+                f"Expected {len(manual_questions)}, got {marks_count}"
             )
 
-        # Calculate total manual marks
-        total_manual = sum(float(mark.marks_awarded) for mark in question_marks)
-
-        # Update evaluation
+        # Update evaluation; completion time and SLA check share one instant
+        now = datetime.now(timezone.utc)
         evaluation.status = EvaluationStatus.COMPLETED.value
-        evaluation.completed_at = datetime.now(timezone.utc)
-        evaluation.total_manual_marks = Decimal(str(total_manual))
+        evaluation.completed_at = now
+        evaluation.total_manual_marks = Decimal(total_manual)
 
         # Check if SLA breached
-        if datetime.now(timezone.utc) > evaluation.sla_deadline:
+        if now > evaluation.sla_deadline:
             evaluation.sla_breached = True
 
         # Update exam scores
-        exam.manual_score = Decimal(str(total_manual))
+        exam.manual_score = Decimal(total_manual)
         exam.total_score = exam.mcq_score + exam.manual_score
 
         if exam.total_marks > 0:
-            exam.percentage = (exam.total_score / Decimal(str(exam.total_marks))) * 100
+            exam.percentage = (exam.total_score / Decimal(exam.total_marks)) * 100
 
         exam.status = ExamStatus.EVALUATED.value
 
         await session.commit()
-        await session.refresh(evaluation)
 
         return evaluation
 
@@ -378,37 +548,26 @@ class EvaluationService:
         Returns:
             Tuple of (evaluations list, total count)
         """
-        # Build query
-        base_query = select(Evaluation).where(
-            and_(
-                Evaluation.teacher_user_id == teacher_user_id,
-                Evaluation.status.in_([
-                    EvaluationStatus.ASSIGNED.value,
-                    EvaluationStatus.IN_PROGRESS.value
-                ])
-            )
+        # Get paginated results ordered by SLA deadline, with the total
+        # count computed alongside each row by a window function
+        offset = (page - 1) * page_size
+        result = await session.execute(
+            _PENDING_PAGE_STMT,
+            {'teacher_user_id': teacher_user_id, 'limit': page_size, 'offset': offset}
         )
-
-        # Get total count
-        count_query = select(func.count()).select_from(Evaluation).where(
-            and_(
-                Evaluation.teacher_user_id == teacher_user_id,
-                Evaluation.status.in_([
-                    EvaluationStatus.ASSIGNED.value,
-                    EvaluationStatus.IN_PROGRESS.value
-                ])
+        rows = result.all()
+        evaluations = [row[0] for row in rows]
+
+        if rows:
+            total = rows[0].total
+        elif offset > 0:
+            # Page is past the end; fall back to a plain count for the total
+            count_result = await session.execute(
+                _PENDING_COUNT_STMT, {'teacher_user_id': teacher_user_id}
             )
-        )
-
-        count_result = await session.execute(count_query)
-        total = count_result.scalar()
-
-        # Get paginated results ordered by SLA deadline
-        offset = (page - 1) * page_size
-        query = base_query.order_by(Evaluation.sla_deadline.asc()).limit(page_size).offset(offset)
-
-        result = await session.execute(query)
-        evaluations = result.scalars().all()
+            total = count_result.scalar()
+        else:
+            total = 0
 
         return evaluations, total
 
@@ -427,27 +586,14 @@ class EvaluationService:
         Returns:
             Dictionary with progress information
         """
-        evaluation = await session.get(Evaluation, evaluation_id)
-        if not evaluation:
-            raise ValueError("Evaluation not found")
-
-        # Get exam instance
-        exam = await session.get(ExamInstance, str(evaluation.exam_instance_id))
-        if not exam:
-            raise ValueError("Exam instance not found")
+        evaluation, exam = await _get_evaluation_with_exam(session, evaluation_id)
 
         # Get questions requiring manual evaluation
-        questions_snapshot = exam.exam_snapshot.get('questions', [])
-        manual_questions = [
-            q for q in questions_snapshot
-            if q['question_type'] in ['VSA', 'SA', 'LA']
-        ]
+        _, manual_questions, total_possible_marks = _parse_snapshot(exam)
 
         # Get evaluated questions
         marks_result = await session.execute(
-            select(QuestionMark).where(
-                QuestionMark.evaluation_id == evaluation_id
-            ).order_by(QuestionMark.question_number)
+            _MARKS_FOR_EVALUATION_STMT, {'evaluation_id': evaluation_id}
         )
         question_marks = marks_result.scalars().all()
 
@@ -456,12 +602,11 @@ class EvaluationService:
         questions_evaluated = len(question_marks)
         questions_remaining = total_questions - questions_evaluated
 
-        total_possible_marks = sum(q['marks'] for q in manual_questions)
-        marks_awarded = sum(float(mark.marks_awarded) for mark in question_marks)
+        marks_awarded = sum((mark.marks_awarded for mark in question_marks), Decimal(0))
 
         current_percentage = None
         if total_possible_marks > 0:
-            current_percentage = (marks_awarded / total_possible_marks) * 100
+            current_percentage = float(marks_awarded / total_possible_marks * 100)
 
         return {
             'evaluation_id': str(evaluation.evaluation_id),
@@ -470,7 +615,7 @@ class EvaluationService:
             'questions_evaluated': questions_evaluated,
             'questions_remaining': questions_remaining,
             'total_possible_marks': float(total_possible_marks),
-            'marks_awarded': marks_awarded,
+            'marks_awarded': float(marks_awarded),
             'current_percentage': current_percentage,
             'question_marks': question_marks,
             'sla_deadline': evaluation.sla_deadline,
@@ -492,27 +637,42 @@ class EvaluationService:
         Returns:
             Dictionary with workload stats
         """
-        # Get all evaluations for teacher
-        result = await session.execute(
-            select(Evaluation).where(
-                Evaluation.teacher_user_id == teacher_user_id
-            )
+        # Counters are aggregated in SQL rather than over every loaded row
+        counts_result = await session.execute(
+            select(
+                func.count().label('total'),
+                func.count().filter(
+                    Evaluation.status == EvaluationStatus.ASSIGNED.value
+                ).label('assigned'),
+                func.count().filter(
+                    Evaluation.status == EvaluationStatus.IN_PROGRESS.value
+                ).label('in_progress'),
+                func.count().filter(
+                    Evaluation.status == EvaluationStatus.COMPLETED.value
+                ).label('completed'),
+                func.count().filter(Evaluation.overdue).label('overdue'),
+                func.count().filter(Evaluation.sla_breached.is_(True)).label('sla_breached')
+            ).where(Evaluation.teacher_user_id == teacher_user_id)
         )
-        evaluations = result.scalars().all()
-
-        total_assigned = len(evaluations)
-        pending_count = sum(1 for e in evaluations if e.status == EvaluationStatus.ASSIGNED.value)
-        in_progress_count = sum(1 for e in evaluations if e.status == EvaluationStatus.IN_PROGRESS.value)
-        completed_count = sum(1 for e in evaluations if e.status == EvaluationStatus.COMPLETED.value)
+        counts = counts_result.one()
 
-        overdue_count = sum(1 for e in evaluations if e.is_overdue())
-        sla_breached_count = sum(1 for e in evaluations if e.sla_breached)
+        total_assigned = counts.total
+        pending_count = counts.assigned
+        in_progress_count = counts.in_progress
+        completed_count = counts.completed
+        overdue_count = counts.overdue
+        sla_breached_count = counts.sla_breached
 
         # Get upcoming deadlines (next 5)
-        upcoming = sorted(
-            [e for e in evaluations if e.status != EvaluationStatus.COMPLETED.value],
-            key=lambda x: x.sla_deadline
-        )[:5]
+        upcoming_result = await session.execute(
+            select(Evaluation).where(
+                and_(
+                    Evaluation.teacher_user_id == teacher_user_id,
+                    Evaluation.status != EvaluationStatus.COMPLETED.value
+                )
+            ).order_by(Evaluation.sla_deadline.asc()).limit(5)
+        )
+        upcoming = upcoming_result.scalars().all()
 
         upcoming_deadlines = [
             {
@@ -547,54 +707,48 @@ class EvaluationService:
         Returns:
             Dictionary with statistics
         """
-        # Total evaluations
-        total_result = await session.execute(
-            select(func.count()).select_from(Evaluation)
-        )
-        total_evaluations = total_result.scalar()
-
-        # By status
-        assigned_result = await session.execute(
-            select(func.count()).select_from(Evaluation).where(
-                Evaluation.status == EvaluationStatus.ASSIGNED.value
-            )
-        )
-        assigned_count = assigned_result.scalar()
-
-        in_progress_result = await session.execute(
-            select(func.count()).select_from(Evaluation).where(
-                Evaluation.status == EvaluationStatus.IN_PROGRESS.value
-            )
-        )
-        in_progress_count = in_progress_result.scalar()
-
-        completed_result = await session.execute(
-            select(func.count()).select_from(Evaluation).where(
-                Evaluation.status == EvaluationStatus.COMPLETED.value
+        # Status breakdown, SLA counters and completion time in one round-trip
+        stats_result = await session.execute(
+            select(
+                func.count().label('total'),
+                func.count().filter(
+                    Evaluation.status == EvaluationStatus.ASSIGNED.value
+                ).label('assigned'),
+                func.count().filter(
+                    Evaluation.status == EvaluationStatus.IN_PROGRESS.value
+                ).label('in_progress'),
+                func.count().filter(
+                    Evaluation.status == EvaluationStatus.COMPLETED.value
+                ).label('completed'),
+                func.count().filter(Evaluation.overdue).label('overdue'),
+                func.count().filter(Evaluation.sla_breached.is_(True)).label('sla_breached'),
+                func.avg(
+                    func.extract('epoch', Evaluation.completed_at - Evaluation.assigned_at)
+                ).filter(
+                    and_(
+                        Evaluation.status == EvaluationStatus.COMPLETED.value,
+                        Evaluation.completed_at.isnot(None)
+                    )
+                ).label('avg_completion_seconds')
             )
         )
-        completed_count = completed_result.scalar()
+        stats = stats_result.one()
 
-        # Get all evaluations for SLA calculations
-        all_evals_result = await session.execute(select(Evaluation))
-        all_evals = all_evals_result.scalars().all()
-
-        total_overdue = sum(1 for e in all_evals if e.is_overdue())
-        total_sla_breached = sum(1 for e in all_evals if e.sla_breached)
+        total_evaluations = stats.total
+        assigned_count = stats.assigned
+        in_progress_count = stats.in_progress
+        completed_count = stats.completed
+        total_overdue = stats.overdue
+        total_sla_breached = stats.sla_breached
 
         sla_compliance_rate = 0.0
         if total_evaluations > 0:
             sla_compliance_rate = ((total_evaluations - total_sla_breached) / total_evaluations) * 100
 
         # Average completion time
-        completed_evals = [e for e in all_evals if e.status == EvaluationStatus.COMPLETED.value and e.completed_at and e.assigned_at]
         avg_completion_time_hours = None
-        if completed_evals:
-            total_hours = sum(
-                (e.completed_at - e.assigned_at).total_seconds() / 3600
-                for e in completed_evals
-            )
-            avg_completion_time_hours = total_hours / len(completed_evals)
+        if stats.avg_completion_seconds is not None:
+            avg_completion_time_hours = float(stats.avg_completion_seconds) / 3600
 
         return {
             'total_evaluations': total_evaluations,
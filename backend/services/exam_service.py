@@ -5,13 +5,14 @@ Business logic for exam operations.
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
-from sqlalchemy.orm.attributes import flag_modified
-from typing import List, Optional, Tuple
+from sqlalchemy import select, and_, func, tuple_, literal, case, cast
+from sqlalchemy.dialects.postgresql import insert as pg_insert, JSONB, UUID
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta, timezone
+import asyncio
+import time
 import uuid
 import random
-import copy
 
 from models import (
     ExamTemplate,
@@ -25,6 +26,34 @@ from models import (
 )
 from models.enums import ExamType, ExamStatus, QuestionType, QuestionStatus
 
+# Enum values used in hot queries, bound once at import
+_ACTIVE = QuestionStatus.ACTIVE.value
+_CREATED = ExamStatus.CREATED.value
+_IN_PROGRESS = ExamStatus.IN_PROGRESS.value
+_OPEN_EXAM_STATUSES = (_IN_PROGRESS, _CREATED)
+
+
+# Active templates per class change rarely, so they are cached in-process
+# as plain dicts (not ORM objects, which are bound to a request session)
+_TEMPLATE_CACHE_TTL_SECONDS = 60
+_template_cache: Dict[str, Tuple[float, List[dict]]] = {}
+
+
+def invalidate_template_cache() -> None:
+    """Drop cached templates; call after creating or updating a template"""
+    _template_cache.clear()
+
+
+# Active question IDs per (class, question_type, marks), used to sample exam
+# sections without scanning the question bank on every exam start
+_QUESTION_POOL_TTL_SECONDS = 300
+_question_pool_cache: Dict[Tuple[str, str, int], Tuple[float, List[uuid.UUID]]] = {}
+
+
+def invalidate_question_pool_cache() -> None:
+    """Drop cached question pools; call after adding or changing questions"""
+    _question_pool_cache.clear()
+
 
 class ExamService:
     """Service for exam-related operations"""
@@ -33,17 +62,23 @@ class ExamService:
     async def get_available_templates(
         session: AsyncSession,
         class_level: str
-    ) -> List[ExamTemplate]:
+    ) -> List[dict]:
         """
         Get available exam templates for a class
 
+        Results are cached per class for a short TTL.
+
         Args:
             session: Database session
             class_level: Student's class (X or XII)
 
         Returns:
-            List of active exam templates
+            List of active exam templates as dicts
         """
+        cached = _template_cache.get(class_level)
+        if cached and time.monotonic() - cached[0] < _TEMPLATE_CACHE_TTL_SECONDS:
+            return cached[1]
+
         result = await session.execute(
             select(ExamTemplate).where(
                 and_(
@@ -52,7 +87,39 @@ class ExamService:
                 )
             ).order_by(ExamTemplate.template_name)
         )
-        return result.scalars().all()
+        templates = [
+            {
+                'template_id': str(t.template_id),
+                'template_name': t.template_name,
+                'exam_type': t.exam_type,
+                'class_level': t.class_level,
+                'total_marks': t.get_total_marks(),
+                'duration_minutes': t.get_duration_minutes(),
+                'section_config': t.config,
+                'is_active': t.is_active
+            }
+            for t in result.scalars().all()
+        ]
+
+        _template_cache[class_level] = (time.monotonic(), templates)
+        return templates
+
+    @staticmethod
+    async def _has_active_exam(session: AsyncSession, student_id: str) -> bool:
+        """
+        Check whether a student has a created or in-progress exam
+
+        Only the primary key is selected so the exam snapshot isn't loaded.
+        """
+        result = await session.execute(
+            select(ExamInstance.exam_instance_id).where(
+                and_(
+                    ExamInstance.student_user_id == student_id,
+                    ExamInstance.status.in_(_OPEN_EXAM_STATUSES)
+                )
+            ).limit(1)
+        )
+        return result.first() is not None
 
     @staticmethod
     async def start_exam(
@@ -74,29 +141,23 @@ class ExamService:
         Raises:
             ValueError: If template not found or student has active exam
         """
-        # Check for active exams
-        result = await session.execute(
-            select(ExamInstance).where(
-                and_(
-                    ExamInstance.student_user_id == student_id,
-                    ExamInstance.status.in_([
-                        ExamStatus.CREATED.value,
-                        ExamStatus.IN_PROGRESS.value
-                    ])
-                )
+        # Check for active exams and load the template concurrently. An
+        # AsyncSession can't run two statements at once, so the template is
+        # read through a short-lived second session on the same engine.
+        async with AsyncSession(session.bind) as template_session:
+            has_active_exam, template = await asyncio.gather(
+                ExamService._has_active_exam(session, student_id),
+                template_session.get(ExamTemplate, template_id)
             )
-        )
-        active_exam = result.scalar_one_or_none()
-        if active_exam:
+
+        if has_active_exam:
             raise ValueError("You already have an active exam in progress")
 
-        # Get template
-        template = await session.get(ExamTemplate, template_id)
         if not template or not template.is_active:
             raise ValueError("Exam template not found or inactive")
 
         # Generate questions based on section_config
-        questions = await ExamService._generate_exam_questions(
+        questions, question_ids = await ExamService._generate_exam_questions(
             session,
             template.class_level,
             template.get_sections()
@@ -105,6 +166,11 @@ class ExamService:
         if not questions:
             raise ValueError("Could not generate exam questions")
 
+        # Store config snapshot with the question mapping so the exam
+        # instance is written with a single INSERT
+        snapshot = dict(template.config or {})
+        snapshot['question_ids'] = question_ids
+
         # Create exam instance
         exam_instance = ExamInstance(
             student_user_id=student_id,
@@ -114,21 +180,12 @@ class ExamService:
             total_marks=template.get_total_marks(),
             duration_minutes=template.get_duration_minutes(),
             started_at=datetime.now(timezone.utc),
-            status=ExamStatus.IN_PROGRESS.value,
-            exam_snapshot=template.config  # Store config snapshot
+            status=_IN_PROGRESS,
+            exam_snapshot=snapshot
         )
 
         session.add(exam_instance)
-        await session.flush()  # Get exam_instance_id
-
-        # Store question mapping in snapshot
-        question_ids = [str(q.question_id) for q in questions]
-        if exam_instance.exam_snapshot is None:
-            exam_instance.exam_snapshot = {}
-        exam_instance.exam_snapshot['question_ids'] = question_ids
-
         await session.commit()
-        await session.refresh(exam_instance)
 
         return exam_instance, questions
 
@@ -137,7 +194,7 @@ class ExamService:
         session: AsyncSession,
         class_level: str,
         sections: list
-    ) -> List[Question]:
+    ) -> Tuple[List[Question], List[str]]:
         """
         Generate exam questions based on section configuration
 
@@ -148,11 +205,10 @@ class ExamService:
                       Each section: {"type": "MCQ", "count": 20, "marks_each": 1}
 
         Returns:
-            List of selected questions
+            Tuple of (selected questions, their IDs as strings)
         """
-        all_questions = []
-
-        # Iterate through sections (MCQ, VSA, SA, LA)
+        # Normalise section configs to (type, marks, count)
+        wanted = []
         for section in sections:
             question_count = section.get('question_count', section.get('count', 0))
             question_type = section.get('question_type', section.get('type'))
@@ -161,29 +217,72 @@ class ExamService:
             if question_count == 0:
                 continue
 
-            # Query questions of this type
+            wanted.append((question_type, marks_per_question, question_count))
+
+        if not wanted:
+            return [], []
+
+        # Candidate ID pools are the same for every student, so they are
+        # cached; only sections missing from the cache hit the database
+        now = time.monotonic()
+        pools = {}
+        missing = []
+        for question_type, marks_per_question, _ in wanted:
+            key = (class_level, question_type, marks_per_question)
+            cached = _question_pool_cache.get(key)
+            if cached and now - cached[0] < _QUESTION_POOL_TTL_SECONDS:
+                pools[key] = cached[1]
+            else:
+                missing.append((question_type, marks_per_question))
+
+        if missing:
             result = await session.execute(
-                select(Question).where(
+                select(Question.question_type, Question.marks, Question.question_id).where(
                     and_(
                         Question.class_level == class_level,
-                        Question.question_type == question_type,
-                        Question.marks == marks_per_question,
-                        Question.status == QuestionStatus.ACTIVE.value
+                        Question.status == _ACTIVE,
+                        tuple_(Question.question_type, Question.marks).in_(missing)
                     )
                 )
             )
-            available_questions = result.scalars().all()
+            fetched = {(class_level, qtype, marks): [] for qtype, marks in missing}
+            for qtype, marks, question_id in result.all():
+                fetched[(class_level, qtype, marks)].append(question_id)
+            for key, ids in fetched.items():
+                _question_pool_cache[key] = (now, ids)
+            pools.update(fetched)
+
+        # Randomly pick IDs per section (or all of them if the pool is too small)
+        chosen_ids = []
+        for question_type, marks_per_question, question_count in wanted:
+            pool = pools[(class_level, question_type, marks_per_question)]
+            chosen_ids.extend(random.sample(pool, min(question_count, len(pool))))
+
+        if not chosen_ids:
+            return [], []
+
+        # Load only the chosen questions, keeping the sampled order. Re-check
+        # status: the pool cache is per process, so another worker may have
+        # archived a question since it was cached.
+        result = await session.execute(
+            select(Question).where(
+                Question.question_id.in_(chosen_ids),
+                Question.status == _ACTIVE
+            )
+        )
+        by_id = {question.question_id: question for question in result.scalars().all()}
 
-            if len(available_questions) < question_count:
-                # Not enough questions available, take what we have
-                all_questions.extend(available_questions)
+        all_questions = []
+        question_ids = []
+        for question_id in chosen_ids:
+            question = by_id.get(question_id)
+            if question is None:
+                # Removed or archived since the pool was cached
                 continue
+            all_questions.append(question)
+            question_ids.append(str(question_id))
 
-            # Randomly select questions
-            selected = random.sample(available_questions, question_count)
-            all_questions.extend(selected)
-
-        return all_questions
+        return all_questions, question_ids
 
     @staticmethod
     async def start_unit_practice(
@@ -210,19 +309,7 @@ class ExamService:
             ValueError: If no questions available or student has active exam
         """
         # Check for active exams
-        result = await session.execute(
-            select(ExamInstance).where(
-                and_(
-                    ExamInstance.student_user_id == student_id,
-                    ExamInstance.status.in_([
-                        ExamStatus.CREATED.value,
-                        ExamStatus.IN_PROGRESS.value
-                    ])
-                )
-            )
-        )
-        active_exam = result.scalar_one_or_none()
-        if active_exam:
+        if await ExamService._has_active_exam(session, student_id):
             raise ValueError("You already have an active exam in progress")
 
         # Define max questions and marks per type
@@ -237,26 +324,24 @@ class ExamService:
         if not config:
             raise ValueError(f"Invalid question type: {question_type}")
 
-        # Query questions for selected units and question type
+        # Randomly pick up to max questions for selected units and question type
         result = await session.execute(
             select(Question).where(
                 and_(
                     Question.class_level == class_level,
                     Question.question_type == question_type,
                     Question.unit.in_(selected_units),
-                    Question.status == QuestionStatus.ACTIVE.value
+                    Question.status == _ACTIVE
                 )
-            )
+            ).order_by(func.random()).limit(config['max_questions'])
         )
-        available_questions = result.scalars().all()
+        questions = result.scalars().all()
 
-        if not available_questions:
+        if not questions:
             unit_list = ', '.join(selected_units)
             raise ValueError(f"No {question_type} questions available for the selected unit(s): {unit_list}")
 
-        # Select up to max questions
-        max_q = min(len(available_questions), config['max_questions'])
-        questions = random.sample(available_questions, max_q)
+        max_q = len(questions)
 
         # Calculate total marks
         total_marks = max_q * config['marks_per_question']
@@ -270,7 +355,7 @@ class ExamService:
             total_marks=total_marks,
             duration_minutes=config['duration'],
             started_at=datetime.now(timezone.utc),
-            status=ExamStatus.IN_PROGRESS.value,
+            status=_IN_PROGRESS,
             exam_snapshot={
                 'question_type': question_type,
                 'selected_units': selected_units,
@@ -281,7 +366,6 @@ class ExamService:
 
         session.add(exam_instance)
         await session.commit()
-        await session.refresh(exam_instance)
 
         return exam_instance, questions
 
@@ -304,32 +388,96 @@ class ExamService:
             selected_option: Selected option (A, B, C, D)
 
         Raises:
-            ValueError: If exam not found or not in correct status
+            ValueError: If exam/question not found or exam not in correct status
         """
-        # Get exam instance
-        exam = await session.get(ExamInstance, exam_instance_id)
-        if not exam or str(exam.student_user_id) != student_id:
-            raise ValueError("Exam not found")
+        if question_number < 1:
+            raise ValueError("Invalid question number")
+
+        # Upsert a single graded answer row rather than rewriting the whole
+        # JSONB snapshot on every selection. The exam ownership/status check
+        # and the question lookup (via the snapshot's question_ids) are part
+        # of the same statement, so the exam isn't fetched first.
+        snapshot_question_id = cast(
+            ExamInstance.exam_snapshot['question_ids'][question_number - 1].astext,
+            UUID(as_uuid=True)
+        )
+        # Non-MCQ questions have no correct_option; the comparison is then
+        # NULL, which the NOT NULL is_correct column would reject
+        is_correct = func.coalesce(Question.correct_option == selected_option, False)
+        stmt = pg_insert(StudentMCQAnswer).from_select(
+            [
+                'exam_instance_id', 'question_number', 'question_id',
+                'selected_choices', 'is_correct', 'marks_awarded', 'marks_possible'
+            ],
+            select(
+                ExamInstance.exam_instance_id,
+                literal(question_number),
+                Question.question_id,
+                literal([selected_option], JSONB),
+                is_correct,
+                case((is_correct, Question.marks), else_=0),
+                Question.marks
+            ).select_from(ExamInstance).join(
+                Question, Question.question_id == snapshot_question_id
+            ).where(
+                and_(
+                    ExamInstance.exam_instance_id == exam_instance_id,
+                    ExamInstance.student_user_id == student_id,
+                    ExamInstance.status.in_(_OPEN_EXAM_STATUSES)
+                )
+            )
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['exam_instance_id', 'question_number'],
+            set_={
+                'selected_choices': stmt.excluded.selected_choices,
+                'is_correct': stmt.excluded.is_correct,
+                'marks_awarded': stmt.excluded.marks_awarded,
+                'answered_at': stmt.excluded.answered_at
+            }
+        )
+        result = await session.execute(stmt)
 
-        if exam.status not in [ExamStatus.IN_PROGRESS.value, ExamStatus.CREATED.value]:
-            raise ValueError("Exam is not in progress")
+        if result.rowcount == 0:
+            # Nothing written; look the exam up only to report why
+            exam = await session.get(ExamInstance, exam_instance_id)
+            if not exam or str(exam.student_user_id) != student_id:
+                raise ValueError("Exam not found")
+            if exam.status not in _OPEN_EXAM_STATUSES:
+                raise ValueError("Exam is not in progress")
+            raise ValueError("Invalid question number")
 
-        # Initialize answers dict in snapshot if not present
-        # Use copy.deepcopy to create a new object so SQLAlchemy detects the change
-        snapshot = copy.deepcopy(exam.exam_snapshot) if exam.exam_snapshot else {}
-        if 'student_answers' not in snapshot:
-            snapshot['student_answers'] = {}
+        await session.commit()
 
-        # Save the answer (key by question number)
-        snapshot['student_answers'][str(question_number)] = selected_option
+    @staticmethod
+    async def get_saved_answers(
+        session: AsyncSession,
+        exam: ExamInstance
+    ) -> dict:
+        """
+        Get the MCQ options a student has saved for an exam
 
-        # Update the snapshot - assign the new object
-        exam.exam_snapshot = snapshot
+        Answers saved before they were stored in student_mcq_answers live in
+        the exam snapshot; rows in the table take precedence.
 
-        # Explicitly mark the JSONB column as modified
-        flag_modified(exam, 'exam_snapshot')
+        Args:
+            session: Database session
+            exam: Exam instance
 
-        await session.commit()
+        Returns:
+            Dict of question number (as string) to selected option
+        """
+        answers = dict((exam.exam_snapshot or {}).get('student_answers', {}))
+
+        result = await session.execute(
+            select(StudentMCQAnswer.question_number, StudentMCQAnswer.selected_choices)
+            .where(StudentMCQAnswer.exam_instance_id == exam.exam_instance_id)
+        )
+        for question_number, selected_choices in result.all():
+            if selected_choices:
+                answers[str(question_number)] = selected_choices[0]
+
+        return answers
 
     @staticmethod
     async def submit_exam(
@@ -351,39 +499,33 @@ class ExamService:
         Raises:
             ValueError: If exam not found or not in correct status
         """
-        from datetime import datetime, timezone
-
         # Get exam instance
         exam = await session.get(ExamInstance, exam_instance_id)
         if not exam or str(exam.student_user_id) != student_id:
             raise ValueError("Exam not found")
 
-        if exam.status not in [ExamStatus.IN_PROGRESS.value, ExamStatus.CREATED.value]:
+        if exam.status not in _OPEN_EXAM_STATUSES:
             raise ValueError("Exam is not in progress")
 
-        # Get saved answers from snapshot
+        # Get saved answers
         snapshot = exam.exam_snapshot or {}
-        student_answers = snapshot.get('student_answers', {})
+        student_answers = await ExamService.get_saved_answers(session, exam)
         question_ids = snapshot.get('question_ids', [])
 
+        # Fetch only the correct options, in one round-trip
+        result = await session.execute(
+            select(Question.question_id, Question.correct_option)
+            .where(Question.question_id.in_(question_ids))
+        )
+        correct_options = {str(question_id): option for question_id, option in result.all()}
+
         # Calculate score
-        correct_count = 0
         total_questions = len(question_ids)
-
-        for idx, question_id in enumerate(question_ids, 1):
-            question_num_str = str(idx)
-            selected_option = student_answers.get(question_num_str)
-
-            if not selected_option:
-                continue
-
-            # Get question to check correct answer
-            question = await session.get(Question, question_id)
-            if not question:
-                continue
-
-            if question.correct_option == selected_option:
-                correct_count += 1
+        correct_count = sum(
+            1 for idx, question_id in enumerate(question_ids, 1)
+            if student_answers.get(str(idx))
+            and correct_options.get(str(question_id)) == student_answers[str(idx)]
+        )
 
         # Calculate score based on marks per question
         marks_per_question = snapshot.get('marks_per_question', 1)
@@ -426,19 +568,26 @@ class ExamService:
         if not exam or str(exam.student_user_id) != student_id:
             raise ValueError("Exam not found")
 
-        if exam.status != ExamStatus.IN_PROGRESS.value:
+        if exam.status != _IN_PROGRESS:
             raise ValueError("Exam is not in progress")
 
+        # Fetch all answered questions in one round-trip
+        result = await session.execute(
+            select(Question.question_id, Question.correct_option, Question.marks)
+            .where(Question.question_id.in_([a['question_id'] for a in answers]))
+        )
+        question_map = {str(row.question_id): row for row in result.all()}
+
         # Store MCQ answers and calculate score
         correct_count = 0
         total_mcq = len(answers)
+        answer_rows = []
 
         for idx, answer_data in enumerate(answers, 1):
             question_id = answer_data['question_id']
             selected_option = answer_data['selected_option']
 
-            # Get question to check correct answer
-            question = await session.get(Question, question_id)
+            question = question_map.get(str(question_id))
             if not question:
                 continue
 
@@ -448,16 +597,32 @@ class ExamService:
                 correct_count += 1
 
             # Save answer - use correct column names from model
-            mcq_answer = StudentMCQAnswer(
-                exam_instance_id=exam_instance_id,
-                question_number=idx,
-                question_id=question_id,
-                selected_choices=[selected_option],  # JSONB array format
-                is_correct=is_correct,
-                marks_awarded=question.marks if is_correct else 0,
-                marks_possible=question.marks
+            answer_rows.append({
+                'exam_instance_id': exam_instance_id,
+                'question_number': idx,
+                'question_id': question_id,
+                'selected_choices': [selected_option],  # JSONB array format
+                'is_correct': is_correct,
+                'marks_awarded': question.marks if is_correct else 0,
+                'marks_possible': question.marks
+            })
+
+        # Insert all answers in a single batched statement
+        if answer_rows:
+            stmt = pg_insert(StudentMCQAnswer)
+            await session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=['exam_instance_id', 'question_number'],
+                    set_={
+                        'question_id': stmt.excluded.question_id,
+                        'selected_choices': stmt.excluded.selected_choices,
+                        'is_correct': stmt.excluded.is_correct,
+                        'marks_awarded': stmt.excluded.marks_awarded,
+                        'marks_possible': stmt.excluded.marks_possible
+                    }
+                ),
+                answer_rows
             )
-            session.add(mcq_answer)
 
         # Update exam status
         exam.status = ExamStatus.SUBMITTED_MCQ.value
@@ -500,10 +665,13 @@ class ExamService:
         student_id: str,
         limit: int = 20,
         offset: int = 0
-    ) -> Tuple[List[ExamInstance], int]:
+    ) -> Tuple[list, int]:
         """
         Get student's exam history
 
+        Only the columns shown in the history list are selected, so the
+        exam snapshot JSONB isn't transferred.
+
         Args:
             session: Database session
             student_id: Student ID
@@ -511,24 +679,41 @@ class ExamService:
             offset: Pagination offset
 
         Returns:
-            Tuple of (exams list, total count)
+            Tuple of (exam rows, total count)
         """
-        # Get total count
-        count_result = await session.execute(
-            select(func.count()).select_from(ExamInstance).where(
-                ExamInstance.student_user_id == student_id
-            )
-        )
-        total = count_result.scalar()
-
-        # Get exams
+        # Get the page, with the total count as a window over the filtered rows
         result = await session.execute(
-            select(ExamInstance).where(
+            select(
+                ExamInstance.exam_instance_id,
+                ExamInstance.exam_type,
+                ExamInstance.status,
+                ExamInstance.started_at,
+                ExamInstance.submitted_at,
+                ExamInstance.total_marks,
+                ExamInstance.mcq_score,
+                ExamInstance.total_score,
+                ExamInstance.exam_snapshot['question_type'].astext.label('question_type'),
+                ExamInstance.exam_snapshot['selected_units'].label('selected_units'),
+                func.count().over().label('total')
+            ).where(
                 ExamInstance.student_user_id == student_id
             ).order_by(ExamInstance.started_at.desc())
             .limit(limit).offset(offset)
         )
-        exams = result.scalars().all()
+        exams = result.all()
+
+        if exams:
+            total = exams[0].total
+        elif offset > 0:
+            # Page is past the end; fall back to a plain count for the total
+            count_result = await session.execute(
+                select(func.count()).select_from(ExamInstance).where(
+                    ExamInstance.student_user_id == student_id
+                )
+            )
+            total = count_result.scalar()
+        else:
+            total = 0
 
         return exams, total
 
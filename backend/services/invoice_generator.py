@@ -5,12 +5,66 @@ Generates GST-compliant tax invoices for subscription payments.
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from models import Invoice, Payment, User, SubscriptionPlan
-from datetime import datetime
+from sqlalchemy import select, update, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from models import Invoice, InvoiceSequence, Payment, User, SubscriptionPlan
+from datetime import datetime, timezone
 from decimal import Decimal
+from functools import lru_cache
+from typing import List, Tuple
+import logging
 import uuid
 
+logger = logging.getLogger(__name__)
+
+# GST math is all Decimal; the pure-Python fallback is far slower than the
+# libmpdec-backed C module that CPython normally ships
+try:
+    import _decimal  # noqa: F401
+except ImportError:
+    logger.warning("C decimal module unavailable; invoice GST math will use the slow pure-Python decimal")
+
+# Static parts of the plain text invoice, rendered once
+_SEP = "=" * 70
+_DASH = "-" * 70
+_TEXT_HEADER = f"{_SEP}\nTAX INVOICE\n{_SEP}\n"
+_TEXT_FOOTER = (
+    "Thank you for your business!\n"
+    "For support: support@mathvidya.com | +91 979 136 8540\n"
+)
+
+
+def _as_decimal(value) -> Decimal:
+    """Numeric columns already load as Decimal; only convert anything else"""
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+# Unique constraint on invoices.payment_id: the migration's index name, or
+# the default name when the table comes from create_all
+_PAYMENT_ID_UNIQUE_CONSTRAINTS = ("ix_invoices_payment_id", "invoices_payment_id_key")
+
+
+def _is_duplicate_payment_invoice(error: IntegrityError) -> bool:
+    """True if the IntegrityError is the invoices.payment_id unique violation"""
+    # asyncpg's own exception (with constraint_name) is chained on the DBAPI one
+    driver_error = getattr(error.orig, "__cause__", None)
+    constraint = getattr(driver_error, "constraint_name", None)
+    if constraint is None:
+        message = str(error.orig)
+        return any(name in message for name in _PAYMENT_ID_UNIQUE_CONSTRAINTS)
+    return constraint in _PAYMENT_ID_UNIQUE_CONSTRAINTS
+
+
+@lru_cache(maxsize=1)
+def _financial_year_code(year: int, after_march: bool) -> str:
+    """FY code for a calendar year/half, e.g. (2025, True) -> FY2526"""
+    # Financial year runs Apr-Mar
+    start = year if after_march else year - 1
+    return f"FY{str(start)[-2:]}{str(start + 1)[-2:]}"
+
 
 class InvoiceGenerator:
     """
@@ -36,10 +90,21 @@ class InvoiceGenerator:
     SGST_RATE = Decimal("9.00")  # 9%
     IGST_RATE = Decimal("18.00")  # 18%
 
+    # Precomputed rate factors and rounding constants for calculate_gst
+    _CGST_FACTOR = CGST_RATE / 100
+    _SGST_FACTOR = SGST_RATE / 100
+    _IGST_FACTOR = IGST_RATE / 100
+    _GST_INCLUSIVE_DIVISOR = 1 + _IGST_FACTOR  # 1.18
+    _QUANT = Decimal("0.01")
+    _ZERO = Decimal("0.00")
+
+    # GST mode per customer state; anything not listed is inter-state (IGST)
+    _STATE_GST_MODE = {COMPANY_STATE: "intra"}
+
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def generate_invoice_number(self) -> str:
+    async def generate_invoice_number(self, now: datetime = None) -> str:
         """
         Generate next invoice number in format: INV-FY2425-00001
 
@@ -47,31 +112,47 @@ class InvoiceGenerator:
         - Jan-Mar 2025 = FY2425
         - Apr-Dec 2025 = FY2526
         """
-        now = datetime.utcnow()
+        return (await self.reserve_invoice_numbers(1, now))[0]
 
-        # Determine financial year
-        if now.month >= 4:  # Apr-Dec
-            fy_year = f"FY{str(now.year)[-2:]}{str(now.year + 1)[-2:]}"
-        else:  # Jan-Mar
-            fy_year = f"FY{str(now.year - 1)[-2:]}{str(now.year)[-2:]}"
+    async def reserve_invoice_numbers(self, count: int, now: datetime = None) -> List[str]:
+        """
+        Reserve a contiguous block of invoice numbers for the current FY.
 
-        # Get last invoice for this FY
-        result = await self.db.execute(
-            select(Invoice)
-            .where(Invoice.invoice_number.like(f"INV-{fy_year}-%"))
-            .order_by(Invoice.invoice_number.desc())
-            .limit(1)
-        )
-        last_invoice = result.scalar_one_or_none()
+        Args:
+            count: Number of invoice numbers to reserve
+            now: Timestamp deciding the FY (defaults to the current UTC time)
 
-        if last_invoice:
-            # Extract sequence number and increment
-            last_num = int(last_invoice.invoice_number.split("-")[-1])
-            next_num = last_num + 1
-        else:
-            next_num = 1
+        Returns:
+            List of invoice numbers in ascending order
+        """
+        now = now or datetime.now(timezone.utc)
+        fy_year = _financial_year_code(now.year, now.month >= 4)
+
+        # Take the block from this FY's counter
+        last_num = await self._increment_sequence(fy_year, count)
+        if last_num is None:
+            # First invoice of the FY; create the counter and retry
+            await self.db.execute(
+                pg_insert(InvoiceSequence)
+                .values(fy_code=fy_year, last_num=0)
+                .on_conflict_do_nothing(index_elements=['fy_code'])
+            )
+            last_num = await self._increment_sequence(fy_year, count)
+
+        return [
+            f"INV-{fy_year}-{num:05d}"
+            for num in range(last_num - count + 1, last_num + 1)
+        ]
 
-        return f"INV-{fy_year}-{next_num:05d}"
+    async def _increment_sequence(self, fy_year: str, count: int = 1):
+        """Atomically bump the FY counter; returns None if it doesn't exist yet"""
+        result = await self.db.execute(
+            update(InvoiceSequence)
+            .where(InvoiceSequence.fy_code == fy_year)
+            .values(last_num=InvoiceSequence.last_num + count)
+            .returning(InvoiceSequence.last_num)
+        )
+        return result.scalar_one_or_none()
 
     def calculate_gst(
         self,
@@ -88,93 +169,98 @@ class InvoiceGenerator:
         Returns:
             dict with cgst, sgst, igst, and total_gst
         """
-        taxable = Decimal(str(taxable_amount))
-
-        # Intra-state (Tamil Nadu to Tamil Nadu): CGST + SGST
-        if customer_state == self.COMPANY_STATE:
-            cgst = (taxable * self.CGST_RATE / 100).quantize(Decimal("0.01"))
-            sgst = (taxable * self.SGST_RATE / 100).quantize(Decimal("0.01"))
-            igst = Decimal("0.00")
-            total_gst = cgst + sgst
-        else:
-            # Inter-state: IGST only
-            cgst = Decimal("0.00")
-            sgst = Decimal("0.00")
-            igst = (taxable * self.IGST_RATE / 100).quantize(Decimal("0.01"))
-            total_gst = igst
-
+        taxable = _as_decimal(taxable_amount)
+
+        # Breakdowns are memoized per amount (plan prices repeat); hand out a copy
+        if self._STATE_GST_MODE.get(customer_state, "inter") == "intra":
+            return dict(self._intra_state_gst(taxable))
+        return dict(self._inter_state_gst(taxable))
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _intra_state_gst(cls, taxable: Decimal) -> dict:
+        """Intra-state supply (Tamil Nadu to Tamil Nadu): CGST + SGST"""
+        cgst = (taxable * cls._CGST_FACTOR).quantize(cls._QUANT)
+        sgst = (taxable * cls._SGST_FACTOR).quantize(cls._QUANT)
         return {
-            "cgst_rate": self.CGST_RATE if cgst > 0 else Decimal("0.00"),
+            "cgst_rate": cls.CGST_RATE if cgst > cls._ZERO else cls._ZERO,
             "cgst_amount": cgst,
-            "sgst_rate": self.SGST_RATE if sgst > 0 else Decimal("0.00"),
+            "sgst_rate": cls.SGST_RATE if sgst > cls._ZERO else cls._ZERO,
             "sgst_amount": sgst,
-            "igst_rate": self.IGST_RATE if igst > 0 else Decimal("0.00"),
-            "igst_amount": igst,
-            "total_gst": total_gst
+            "igst_rate": cls._ZERO,
+            "igst_amount": cls._ZERO,
+            "total_gst": cgst + sgst
         }
 
-    async def create_invoice(
-        self,
-        payment_id: uuid.UUID,
-        subscription_id: uuid.UUID = None
-    ) -> Invoice:
-        """
-        Create invoice for a payment.
-
-        Args:
-            payment_id: Payment record ID
-            subscription_id: Optional subscription ID (if payment created subscription)
-
-        Returns:
-            Created Invoice object
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _inter_state_gst(cls, taxable: Decimal) -> dict:
+        """Inter-state supply: IGST only"""
+        igst = (taxable * cls._IGST_FACTOR).quantize(cls._QUANT)
+        return {
+            "cgst_rate": cls._ZERO,
+            "cgst_amount": cls._ZERO,
+            "sgst_rate": cls._ZERO,
+            "sgst_amount": cls._ZERO,
+            "igst_rate": cls.IGST_RATE if igst > cls._ZERO else cls._ZERO,
+            "igst_amount": igst,
+            "total_gst": igst
+        }
 
-        Raises:
-            ValueError: If payment not found or already has invoice
-        """
-        # Get payment details
-        result = await self.db.execute(
-            select(Payment).where(Payment.id == payment_id)
+    @staticmethod
+    def _payment_details_query():
+        """Payment with its user, plan and existing invoice ID (if any)"""
+        return (
+            select(Payment, User, SubscriptionPlan, Invoice.id)
+            .outerjoin(User, User.user_id == Payment.user_id)
+            .outerjoin(SubscriptionPlan, SubscriptionPlan.plan_type == Payment.plan_type)
+            .outerjoin(Invoice, Invoice.payment_id == Payment.id)
         )
-        payment = result.scalar_one_or_none()
 
-        if not payment:
+    @staticmethod
+    def _check_payment_row(payment_id, row) -> Tuple[Payment, User, SubscriptionPlan]:
+        """Validate a _payment_details_query row, raising ValueError if unusable"""
+        if not row:
             raise ValueError(f"Payment {payment_id} not found")
 
-        if payment.invoice:
-            raise ValueError(f"Payment {payment_id} already has an invoice")
+        payment, user, plan, existing_invoice_id = row
 
-        # Get user details
-        result = await self.db.execute(
-            select(User).where(User.user_id == payment.user_id)
-        )
-        user = result.scalar_one_or_none()
+        if existing_invoice_id:
+            raise ValueError(f"Payment {payment_id} already has an invoice")
 
         if not user:
             raise ValueError(f"User {payment.user_id} not found")
 
-        # Get plan details
-        result = await self.db.execute(
-            select(SubscriptionPlan).where(SubscriptionPlan.plan_type == payment.plan_type)
-        )
-        plan = result.scalar_one_or_none()
-
         if not plan:
             raise ValueError(f"Plan {payment.plan_type} not found")
 
+        return payment, user, plan
+
+    def _invoice_values(
+        self,
+        payment: Payment,
+        user: User,
+        plan: SubscriptionPlan,
+        invoice_number: str,
+        now: datetime,
+        subscription_id: uuid.UUID = None
+    ) -> dict:
+        """Column values for a payment's Invoice row"""
         # Calculate amounts
         # payment.amount_inr already includes GST
         # We need to reverse-calculate the base amount
-        total_amount = Decimal(str(payment.amount_inr))
+        # (Payment amount columns are Numeric(asdecimal=True), so these load as Decimal)
+        total_amount = payment.amount_inr
 
         # If discount was applied, base amount is stored in payment
         if payment.base_amount_inr:
-            base_amount = Decimal(str(payment.base_amount_inr))
+            base_amount = payment.base_amount_inr
         else:
             # Reverse calculate from total (total = base * 1.18 for 18% GST)
-            base_amount = (total_amount / Decimal("1.18")).quantize(Decimal("0.01"))
+            base_amount = (total_amount / self._GST_INCLUSIVE_DIVISOR).quantize(self._QUANT)
 
         # Subtract discount to get taxable amount
-        discount = Decimal(str(payment.discount_amount_inr or 0))
+        discount = payment.discount_amount_inr or self._ZERO
         taxable_amount = base_amount - discount
 
         # Calculate GST
@@ -183,17 +269,13 @@ class InvoiceGenerator:
         customer_state = "Tamil Nadu"
         gst_breakdown = self.calculate_gst(taxable_amount, customer_state)
 
-        # Generate invoice number
-        invoice_number = await self.generate_invoice_number()
-
-        # Create invoice record
-        invoice = Invoice(
-            id=uuid.uuid4(),
+        # Invoice record
+        return dict(
             invoice_number=invoice_number,
             user_id=payment.user_id,
             payment_id=payment.id,
             subscription_id=subscription_id,
-            invoice_date=datetime.utcnow().isoformat(),
+            invoice_date=now,
 
             # Customer details
             customer_name=user.full_name or user.email,
@@ -230,19 +312,113 @@ class InvoiceGenerator:
             company_state=self.COMPANY_STATE,
 
             # PDF will be generated later
-            pdf_url=None,
+            pdf_url=None
+        )
+
+    async def create_invoice(
+        self,
+        payment_id: uuid.UUID,
+        subscription_id: uuid.UUID = None
+    ) -> Invoice:
+        """
+        Create invoice for a payment.
 
-            created_at=datetime.utcnow().isoformat()
+        Args:
+            payment_id: Payment record ID
+            subscription_id: Optional subscription ID (if payment created subscription)
+
+        Returns:
+            Created Invoice object
+
+        Raises:
+            ValueError: If payment not found or already has invoice
+        """
+        # Get payment, user, plan and any existing invoice in one query
+        result = await self.db.execute(
+            self._payment_details_query().where(Payment.id == payment_id)
         )
+        payment, user, plan = self._check_payment_row(payment_id, result.one_or_none())
 
-        self.db.add(invoice)
+        # One timestamp for the FY, invoice_date and created_at
+        now = datetime.now(timezone.utc)
 
-        # Commit changes (relationship will be established automatically via payment_id)
-        await self.db.commit()
-        await self.db.refresh(invoice)
+        # Generate invoice number
+        invoice_number = await self.generate_invoice_number(now)
+
+        values = self._invoice_values(payment, user, plan, invoice_number, now, subscription_id)
+
+        # The Core INSERT bypasses the unit of work and sessions don't
+        # autoflush, so flush first: the caller may have a pending
+        # Subscription that subscription_id points at
+        await self.db.flush()
+
+        # Plain INSERT ... RETURNING for the invoice row itself
+        # (relationship will be established automatically via payment_id)
+        try:
+            invoice = await self.db.scalar(
+                insert(Invoice).values(**values).returning(Invoice)
+            )
+            await self.db.commit()
+        except IntegrityError as e:
+            await self.db.rollback()
+            if not _is_duplicate_payment_invoice(e):
+                raise
+            # invoices.payment_id is unique; a concurrent request got there first
+            raise ValueError(f"Payment {payment_id} already has an invoice")
 
         return invoice
 
+    async def create_invoices_bulk(
+        self,
+        payment_ids: List[uuid.UUID]
+    ) -> Tuple[List[Invoice], List[dict]]:
+        """
+        Create invoices for many payments at once.
+
+        Loads every payment with one query, reserves a contiguous block of
+        invoice numbers and commits all invoices together.
+
+        Args:
+            payment_ids: Payment record IDs
+
+        Returns:
+            Tuple of (created invoices, errors)
+        """
+        # Deduplicate while keeping the caller's order
+        payment_ids = list(dict.fromkeys(str(pid) for pid in payment_ids))
+        if not payment_ids:
+            return [], []
+
+        result = await self.db.execute(
+            self._payment_details_query().where(Payment.id.in_(payment_ids))
+        )
+        rows = {str(row[0].id): row for row in result.all()}
+
+        valid = []
+        errors = []
+        for payment_id in payment_ids:
+            try:
+                valid.append(self._check_payment_row(payment_id, rows.get(payment_id)))
+            except ValueError as e:
+                errors.append({'payment_id': payment_id, 'error': str(e)})
+
+        if not valid:
+            return [], errors
+
+        now = datetime.now(timezone.utc)
+        invoice_numbers = await self.reserve_invoice_numbers(len(valid), now)
+        result = await self.db.scalars(
+            insert(Invoice).returning(Invoice, sort_by_parameter_order=True),
+            [
+                self._invoice_values(payment, user, plan, invoice_number, now)
+                for (payment, user, plan), invoice_number in zip(valid, invoice_numbers)
+            ]
+        )
+        invoices = result.all()
+        await self.db.commit()
+
+        return invoices, errors
+
     def generate_invoice_text(self, invoice: Invoice) -> str:
         """
         Generate plain text invoice for email/display.
@@ -253,63 +429,55 @@ class InvoiceGenerator:
         Returns:
             Plain text invoice
         """
-        lines = [
-            "=" * 70,
-            f"TAX INVOICE",
-            "=" * 70,
-            "",
-            f"Invoice Number: {invoice.invoice_number}",
-            f"Invoice Date: {invoice.invoice_date[:10]}",
-            "",
-            "SELLER DETAILS:",
-            "-" * 70,
-            f"{invoice.company_name}",
-            f"GSTIN: {invoice.company_gst}",
-            f"{invoice.company_address}",
-            f"State: {invoice.company_state} (Code: {self.COMPANY_STATE_CODE})",
-            "",
-            "BUYER DETAILS:",
-            "-" * 70,
-            f"{invoice.customer_name}",
-            f"Email: {invoice.customer_email}",
-            f"State: {invoice.customer_state or 'Tamil Nadu'}",
-            "",
-            "ITEM DETAILS:",
-            "-" * 70,
-            f"Description: {invoice.item_description}",
-            f"Quantity: {invoice.item_quantity}",
-            f"Unit Price: ₹{invoice.item_unit_price:.2f}",
-            f"Subtotal: ₹{invoice.subtotal_inr:.2f}",
-            ""
-        ]
-
-        if invoice.discount_inr > 0:
-            lines.append(f"Discount: -₹{invoice.discount_inr:.2f}")
-            lines.append("")
-
-        lines.extend([
-            f"Taxable Amount: ₹{invoice.taxable_amount_inr:.2f}",
-            "",
-            "GST BREAKDOWN:",
-            "-" * 70
-        ])
+        discount = (
+            f"Discount: -₹{invoice.discount_inr:.2f}\n\n"
+            if invoice.discount_inr > self._ZERO else ""
+        )
 
-        if invoice.cgst_amount_inr > 0:
-            lines.append(f"CGST ({invoice.cgst_rate}%): ₹{invoice.cgst_amount_inr:.2f}")
-            lines.append(f"SGST ({invoice.sgst_rate}%): ₹{invoice.sgst_amount_inr:.2f}")
+        if invoice.cgst_amount_inr > self._ZERO:
+            gst_lines = (
+                f"CGST ({invoice.cgst_rate}%): ₹{invoice.cgst_amount_inr:.2f}\n"
+                f"SGST ({invoice.sgst_rate}%): ₹{invoice.sgst_amount_inr:.2f}\n"
+            )
         else:
-            lines.append(f"IGST ({invoice.igst_rate}%): ₹{invoice.igst_amount_inr:.2f}")
-
-        lines.extend([
-            f"Total GST: ₹{invoice.total_gst_inr:.2f}",
-            "",
-            "=" * 70,
-            f"TOTAL AMOUNT: ₹{invoice.total_amount_inr:.2f}",
-            "=" * 70,
-            "",
-            "Thank you for your business!",
-            "For support: support@mathvidya.com | +91 979 136 8540",
-            ""
-        ])
-
-        return "\n".join(lines)
+            gst_lines = f"IGST ({invoice.igst_rate}%): ₹{invoice.igst_amount_inr:.2f}\n"
+
+        return (
+            f"{_TEXT_HEADER}\n"
+            f"Invoice Number: {invoice.invoice_number}\n"
+            f"Invoice Date: {invoice.invoice_date:%Y-%m-%d}\n"
+            "\n"
+            "SELLER DETAILS:\n"
+            f"{_DASH}\n"
+            f"{invoice.company_name}\n"
+            f"GSTIN: {invoice.company_gst}\n"
+            f"{invoice.company_address}\n"
+            f"State: {invoice.company_state} (Code: {self.COMPANY_STATE_CODE})\n"
+            "\n"
+            "BUYER DETAILS:\n"
+            f"{_DASH}\n"
+            f"{invoice.customer_name}\n"
+            f"Email: {invoice.customer_email}\n"
+            f"State: {invoice.customer_state or 'Tamil Nadu'}\n"
+            "\n"
+            "ITEM DETAILS:\n"
+            f"{_DASH}\n"
+            f"Description: {invoice.item_description}\n"
+            f"Quantity: {invoice.item_quantity}\n"
+            f"Unit Price: ₹{invoice.item_unit_price:.2f}\n"
+            f"Subtotal: ₹{invoice.subtotal_inr:.2f}\n"
+            "\n"
+            f"{discount}"
+            f"Taxable Amount: ₹{invoice.taxable_amount_inr:.2f}\n"
+            "\n"
+            "GST BREAKDOWN:\n"
+            f"{_DASH}\n"
+            f"{gst_lines}"
+            f"Total GST: ₹{invoice.total_gst_inr:.2f}\n"
+            "\n"
+            f"{_SEP}\n"
+            f"TOTAL AMOUNT: ₹{invoice.total_amount_inr:.2f}\n"
+            f"{_SEP}\n"
+            "\n"
+            f"{_TEXT_FOOTER}"
+        )
@@ -5,16 +5,18 @@ Business logic for notifications, emails, and alerts.
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, insert, update, func, and_, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta
 from uuid import uuid4
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
+import asyncio
+import copy
+import html
+import time
+from email.message import EmailMessage
 
+from config.settings import settings
 from models import (
     User, Notification, NotificationPreference
 )
@@ -26,15 +28,209 @@ from schemas.notification import (
 )
 
 
+# Notification email layout; only subject, message and button vary per send
+_EMAIL_HTML_TEMPLATE = """
+<html>
+<head>
+    <style>
+        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+        .header {{ background-color: #4CAF50; color: white; padding: 20px; text-align: center; }}
+        .content {{ padding: 20px; background-color: #f9f9f9; }}
+        .button {{ display: inline-block; padding: 10px 20px; background-color: #4CAF50;
+                  color: white; text-decoration: none; border-radius: 5px; margin-top: 20px; }}
+        .footer {{ padding: 20px; text-align: center; font-size: 12px; color: #666; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>Mathvidya</h1>
+        </div>
+        <div class="content">
+            <h2>{subject}</h2>
+            <p>{message}</p>
+            {button}
+        </div>
+        <div class="footer">
+            <p>© 2025 Mathvidya. All rights reserved.</p>
+            <p>This is an automated email. Please do not reply.</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+
+# Preference switch for each category / delivery channel
+_CATEGORY_PREF_ATTR: Dict[NotificationCategory, str] = {
+    NotificationCategory.EVALUATION_COMPLETE: 'evaluation_complete',
+    NotificationCategory.SLA_REMINDER: 'sla_reminders',
+    NotificationCategory.SLA_BREACH: 'sla_reminders',
+    NotificationCategory.SUBSCRIPTION_EXPIRING: 'subscription_alerts',
+    NotificationCategory.SUBSCRIPTION_EXPIRED: 'subscription_alerts',
+    NotificationCategory.PERFORMANCE_REPORT: 'performance_reports',
+    NotificationCategory.PARENT_UPDATE: 'parent_updates',
+    NotificationCategory.SYSTEM_ANNOUNCEMENT: 'system_announcements',
+}
+
+_CHANNEL_PREF_ATTR: Dict[NotificationType, str] = {
+    NotificationType.EMAIL: 'email_enabled',
+    NotificationType.SMS: 'sms_enabled',
+    NotificationType.IN_APP: 'in_app_enabled',
+    NotificationType.PUSH: 'push_enabled',
+}
+
+
+# Preferences for users who never changed them
+_DEFAULT_PREFERENCES: Dict[str, bool] = {
+    'email_enabled': True,
+    'sms_enabled': False,
+    'in_app_enabled': True,
+    'push_enabled': False,
+    'evaluation_complete': True,
+    'sla_reminders': True,
+    'subscription_alerts': True,
+    'performance_reports': True,
+    'parent_updates': True,
+    'system_announcements': True,
+    'daily_digest': False,
+    'weekly_digest': False,
+}
+
+
+# Notification preference flags per user, read on every notification create.
+# Plain dicts (not ORM rows, which belong to the session that loaded them);
+# only used for filtering, anything that modifies preferences loads a fresh row.
+_PREFERENCES_CACHE_TTL_SECONDS = 300
+_PREFERENCES_CACHE_MAX_USERS = 10_000
+_preferences_cache: Dict[str, Tuple[float, Dict[str, bool]]] = {}
+
+
+def _preference_flags(preferences: NotificationPreference) -> Dict[str, bool]:
+    """Copy a preferences row's switches into a plain dict"""
+    return {key: getattr(preferences, key) for key in _DEFAULT_PREFERENCES}
+
+
+def _cache_preferences(user_id: str, flags: Dict[str, bool]) -> None:
+    if len(_preferences_cache) >= _PREFERENCES_CACHE_MAX_USERS:
+        # Crude bound; entries repopulate on the next read
+        _preferences_cache.clear()
+    _preferences_cache[str(user_id)] = (time.monotonic(), flags)
+
+
+def invalidate_preferences_cache(user_id: Optional[str] = None) -> None:
+    """Drop cached preferences for one user (or everyone)"""
+    if user_id is None:
+        _preferences_cache.clear()
+    else:
+        _preferences_cache.pop(str(user_id), None)
+
+
+# Admin notification stats (full-table counts); a minute stale is fine
+_STATS_CACHE_TTL_SECONDS = 60
+_stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+
+
+class _SmtpSession:
+    """
+    One SMTP connection reused across a batch of emails
+
+    Connects lazily on the first send, reconnects if the server drops the
+    connection, and recycles it after MAX_MESSAGES_PER_CONNECTION sends to
+    stay under provider per-connection limits.
+    """
+
+    MAX_MESSAGES_PER_CONNECTION = 100
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        use_tls: bool = True
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self._server = None
+        self._sent = 0
+
+    @property
+    def enabled(self) -> bool:
+        """False when SMTP credentials aren't configured (emails are only logged)"""
+        return bool(self.user and self.password)
+
+    async def _connect(self):
+        # aiosmtplib yields to the event loop during connect, TLS and send
+        import aiosmtplib
+
+        server = aiosmtplib.SMTP(hostname=self.host, port=self.port, start_tls=self.use_tls)
+        await server.connect()
+        await server.login(self.user, self.password)
+        self._server = server
+        self._sent = 0
+
+    async def send_message(self, msg):
+        if not self.enabled:
+            print(f"[EMAIL] SMTP not configured; not sent to {msg['To']}")
+            return
+
+        from aiosmtplib import SMTPServerDisconnected
+
+        if self._server is None or self._sent >= self.MAX_MESSAGES_PER_CONNECTION:
+            await self.close()
+            await self._connect()
+
+        try:
+            await self._server.send_message(msg)
+        except SMTPServerDisconnected:
+            # Idle connection timed out; reconnect once and retry
+            await self._connect()
+            await self._server.send_message(msg)
+
+        self._sent += 1
+
+    async def close(self):
+        if self._server is not None:
+            from aiosmtplib import SMTPException
+
+            try:
+                await self._server.quit()
+            except SMTPException:
+                pass
+            self._server = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
 class NotificationService:
     """Service for notification management"""
 
-    # Email configuration (should be loaded from environment variables in production)
-    SMTP_HOST = "smtp.gmail.com"
-    SMTP_PORT = 587
-    SMTP_USER = "noreply@mathvidya.com"
-    SMTP_PASSWORD = "your-app-password"  # Use environment variable
-    FROM_EMAIL = "Mathvidya <noreply@mathvidya.com>"
+    # Failed sends stay pending and are retried by later batches up to this
+    MAX_SEND_ATTEMPTS = 5
+
+    @staticmethod
+    def smtp_session() -> _SmtpSession:
+        """
+        SMTP connection to share across a batch of sends (use as an async
+        context manager). Configured from settings like EmailService; without
+        SMTP_USER/SMTP_PASSWORD it only logs.
+        """
+        return _SmtpSession(
+            settings.SMTP_HOST,
+            settings.SMTP_PORT,
+            settings.SMTP_USER,
+            settings.SMTP_PASSWORD,
+            settings.SMTP_USE_TLS
+        )
 
     @staticmethod
     async def create_notification(
@@ -52,7 +248,7 @@ class NotificationService:
             Created notification
         """
         # Check user preferences
-        preferences = await NotificationService._get_user_preferences(
+        preferences = await NotificationService._get_cached_preferences(
             session,
             request.user_id
         )
@@ -67,6 +263,8 @@ class NotificationService:
         if not allowed_types:
             raise ValueError(f"User has disabled all notification channels for {request.category}")
 
+        status, sent_at = NotificationService._initial_delivery(allowed_types)
+
         # Create notification record
         notification = Notification(
             notification_id=uuid4(),
@@ -76,24 +274,134 @@ class NotificationService:
             title=request.title,
             message=request.message,
             notification_types=[nt.value for nt in allowed_types],
-            status='pending',
+            status=status,
+            sent_at=sent_at,
             is_read=False,
             action_url=request.action_url,
             extra_data=request.metadata,
-            expires_at=request.expires_at,
-            created_at=datetime.utcnow()
+            expires_at=request.expires_at
         )
 
+        # created_at is fetched by the INSERT's RETURNING (eager_defaults)
         session.add(notification)
         await session.commit()
-        await session.refresh(notification)
 
         return notification
 
+    @staticmethod
+    def _initial_delivery(
+        allowed_types: List[NotificationType]
+    ) -> Tuple[str, Optional[datetime]]:
+        """
+        Status and sent_at for a new notification
+
+        Only email needs the send task; in-app notifications are delivered by
+        being stored (SMS/push are placeholders). Anything without email is
+        sent on creation so it doesn't sit in the pending queue, which the
+        task leaves alone when SMTP isn't configured.
+        """
+        if NotificationType.EMAIL in allowed_types:
+            return 'pending', None
+        return 'sent', datetime.utcnow()
+
+    @staticmethod
+    async def bulk_create_notifications(
+        session: AsyncSession,
+        requests: List[CreateNotificationRequest]
+    ) -> List[Notification]:
+        """
+        Create many notifications in one transaction
+
+        Preferences for every recipient are loaded with a single query;
+        requests whose channels are all disabled are skipped.
+
+        Args:
+            session: Database session
+            requests: Notification creation requests
+
+        Returns:
+            Created notifications
+        """
+        if not requests:
+            return []
+
+        user_ids = {r.user_id for r in requests}
+        result = await session.execute(
+            select(NotificationPreference).where(
+                NotificationPreference.user_id.in_(user_ids)
+            )
+        )
+        prefs_by_user = {
+            str(p.user_id): _preference_flags(p) for p in result.scalars().all()
+        }
+
+        # Users without a preferences row get the defaults. ON CONFLICT covers
+        # a concurrent first notification for the same user (as in
+        # _get_user_preferences); re-select so either writer's row is used.
+        missing = [user_id for user_id in user_ids if user_id not in prefs_by_user]
+        if missing:
+            await session.execute(
+                pg_insert(NotificationPreference)
+                .values([
+                    {'user_id': user_id, **_DEFAULT_PREFERENCES}
+                    for user_id in missing
+                ])
+                .on_conflict_do_nothing(index_elements=['user_id'])
+            )
+            result = await session.execute(
+                select(NotificationPreference).where(
+                    NotificationPreference.user_id.in_(missing)
+                )
+            )
+            prefs_by_user.update(
+                (str(p.user_id), _preference_flags(p)) for p in result.scalars().all()
+            )
+
+        for user_id, flags in prefs_by_user.items():
+            _cache_preferences(user_id, flags)
+
+        rows = []
+        for request in requests:
+            allowed_types = NotificationService._filter_by_preferences(
+                request.notification_types,
+                request.category,
+                prefs_by_user[request.user_id]
+            )
+            if not allowed_types:
+                continue
+
+            status, sent_at = NotificationService._initial_delivery(allowed_types)
+            rows.append(dict(
+                notification_id=uuid4(),
+                user_id=request.user_id,
+                category=request.category.value,
+                priority=request.priority.value,
+                title=request.title,
+                message=request.message,
+                notification_types=[nt.value for nt in allowed_types],
+                status=status,
+                sent_at=sent_at,
+                is_read=False,
+                action_url=request.action_url,
+                extra_data=request.metadata,
+                expires_at=request.expires_at
+            ))
+
+        # One multi-row INSERT ... RETURNING, bypassing the unit of work
+        notifications = []
+        if rows:
+            result = await session.scalars(insert(Notification).returning(Notification), rows)
+            notifications = result.all()
+        await session.commit()
+
+        return notifications
+
     @staticmethod
     async def send_notification(
         session: AsyncSession,
-        notification: Notification
+        notification: Notification,
+        user: Optional[User] = None,
+        smtp: Optional[_SmtpSession] = None
     ) -> bool:
         """
         Send notification via all configured channels
@@ -101,6 +409,8 @@ class NotificationService:
         Args:
             session: Database session
             notification: Notification to send
+            user: Recipient, if the caller already has it loaded
+            smtp: Shared SMTP session when sending a batch
 
         Returns:
             True if sent successfully
@@ -109,7 +419,8 @@ class NotificationService:
 
         try:
             # Get user details
-            user = await session.get(User, notification.user_id)
+            if user is None:
+                user = await session.get(User, notification.user_id)
             if not user:
                 raise ValueError(f"User not found: {notification.user_id}")
 
@@ -120,7 +431,8 @@ class NotificationService:
                     user.full_name,
                     notification.title,
                     notification.message,
-                    notification.action_url
+                    notification.action_url,
+                    smtp
                 )
                 success = success and email_success
 
@@ -137,26 +449,227 @@ class NotificationService:
                 pass
 
             # Update notification status
-            notification.status = 'sent' if success else 'failed'
-            notification.sent_at = datetime.utcnow()
+            if success:
+                notification.status = 'sent'
+                notification.sent_at = datetime.utcnow()
+            else:
+                NotificationService._record_send_failure(notification, 'email delivery failed')
             await session.commit()
 
             return success
 
         except Exception as e:
-            notification.status = 'failed'
-            notification.extra_data = notification.extra_data or {}
-            notification.extra_data['error'] = str(e)
+            NotificationService._record_send_failure(notification, str(e))
             await session.commit()
             return False
 
+    @staticmethod
+    def _record_send_failure(notification: Notification, error: str) -> None:
+        """
+        Count a failed send attempt
+
+        The notification stays pending (picked up again by the next batch)
+        until it has failed MAX_SEND_ATTEMPTS times, then it is marked failed.
+        """
+        extra_data = dict(notification.extra_data or {})
+        attempts = extra_data.get('send_attempts', 0) + 1
+        extra_data['send_attempts'] = attempts
+        extra_data['error'] = error
+        # Reassign rather than mutate so the JSONB change is flushed
+        notification.extra_data = extra_data
+        notification.status = (
+            'failed' if attempts >= NotificationService.MAX_SEND_ATTEMPTS else 'pending'
+        )
+
+    @staticmethod
+    async def send_pending_notifications(
+        session: AsyncSession,
+        limit: int = 100
+    ) -> Dict[str, int]:
+        """
+        Send queued (pending) notifications, oldest first
+
+        The batch is claimed first (pending -> sending) with FOR UPDATE SKIP
+        LOCKED, so overlapping runs (a retry alongside the next beat run, or a
+        run longer than a minute) never pick up the same rows. Recipients are
+        then loaded with one IN query and all emails share one SMTP
+        connection. Each send still commits on its own so a failure part-way
+        through doesn't resend what already went out. If a third of the batch
+        fails the run stops early; unsent rows go back to pending.
+
+        Returns:
+            Dict with sent and failed counts
+        """
+        claimable = (
+            select(Notification.notification_id)
+            .where(Notification.status == 'pending')
+            .order_by(Notification.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.scalars(
+            update(Notification)
+            .where(Notification.notification_id.in_(claimable))
+            .values(status='sending')
+            .returning(Notification)
+            .execution_options(synchronize_session=False)
+        )
+        # RETURNING order isn't defined; restore oldest first
+        notifications = sorted(result.all(), key=lambda n: n.created_at)
+        await session.commit()
+
+        if not notifications:
+            return {'sent': 0, 'failed': 0}
+
+        result = await session.execute(
+            select(User).where(User.user_id.in_({n.user_id for n in notifications}))
+        )
+        users_by_id = {user.user_id: user for user in result.scalars().all()}
+
+        sent = 0
+        failed = 0
+        max_failures = max(1, len(notifications) // 3)
+        try:
+            async with NotificationService.smtp_session() as smtp:
+                for notification in notifications:
+                    if await NotificationService.send_notification(
+                        session, notification, users_by_id.get(notification.user_id), smtp
+                    ):
+                        sent += 1
+                    else:
+                        failed += 1
+                        if failed >= max_failures:
+                            break
+        finally:
+            # Release whatever this run claimed but didn't get to
+            unsent = [n for n in notifications if n.status == 'sending']
+            for notification in unsent:
+                notification.status = 'pending'
+            if unsent:
+                await session.commit()
+
+        return {'sent': sent, 'failed': failed}
+
+    @staticmethod
+    def _build_email(
+        subject: str,
+        message: str,
+        action_url: Optional[str] = None
+    ) -> EmailMessage:
+        """Build an email with From, Subject and both bodies set, but no To"""
+        msg = EmailMessage()
+        msg['From'] = f"{settings.EMAILS_FROM_NAME} <{settings.EMAILS_FROM_EMAIL}>"
+        msg['Subject'] = subject
+
+        # Create HTML body
+        button = (
+            f'<a href="{html.escape(action_url)}" class="button">View Details</a>'
+            if action_url else ''
+        )
+        html_body = _EMAIL_HTML_TEMPLATE.format(
+            subject=html.escape(subject),
+            message=html.escape(message),
+            button=button
+        )
+
+        # Create plain text alternative
+        text_body = f"{subject}\n\n{message}"
+        if action_url:
+            text_body += f"\n\nView details: {action_url}"
+
+        # Plain text body with the HTML as its alternative
+        msg.set_content(text_body)
+        msg.add_alternative(html_body, subtype='html')
+        return msg
+
+    @staticmethod
+    async def send_broadcast(
+        session: AsyncSession,
+        user_ids: List[str],
+        subject: str,
+        message: str,
+        action_url: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Send the same system announcement to many users
+
+        Recorded as SYSTEM_ANNOUNCEMENT notifications through
+        bulk_create_notifications, so each user's category and channel
+        preferences apply and the announcement shows in their history. The
+        email is rendered once and copied per recipient with only the To
+        header swapped; all sends share one SMTP connection.
+
+        Returns:
+            Dict with sent and failed email counts
+        """
+        notifications = await NotificationService.bulk_create_notifications(
+            session,
+            [
+                CreateNotificationRequest(
+                    user_id=str(user_id),
+                    category=NotificationCategory.SYSTEM_ANNOUNCEMENT,
+                    title=subject,
+                    message=message,
+                    action_url=action_url
+                )
+                for user_id in user_ids
+            ]
+        )
+
+        email_notifications = [
+            n for n in notifications
+            if NotificationType.EMAIL.value in n.notification_types
+        ]
+        users_by_id = {}
+        if email_notifications:
+            result = await session.execute(
+                select(User).where(
+                    User.user_id.in_([n.user_id for n in email_notifications])
+                )
+            )
+            users_by_id = {user.user_id: user for user in result.scalars().all()}
+
+        template = NotificationService._build_email(subject, message, action_url)
+
+        sent = 0
+        failed_ids = set()
+        async with NotificationService.smtp_session() as smtp:
+            for notification in email_notifications:
+                user = users_by_id.get(notification.user_id)
+                try:
+                    if user is None:
+                        raise ValueError(f"User not found: {notification.user_id}")
+                    # copy.copy shares the header list; del rebinds it, so the
+                    # template's headers are left alone
+                    msg = copy.copy(template)
+                    del msg['To']
+                    msg['To'] = f"{user.full_name} <{user.email}>"
+                    await smtp.send_message(msg)
+                    sent += 1
+                except Exception as e:
+                    print(f"[EMAIL ERROR] Failed to send broadcast {notification.notification_id}: {e}")
+                    NotificationService._record_send_failure(notification, str(e))
+                    failed_ids.add(notification.notification_id)
+
+        # Failed emails stay with the send_pending_notifications retries;
+        # everything else is delivered (in-app only by being stored)
+        now = datetime.utcnow()
+        for notification in notifications:
+            if notification.notification_id not in failed_ids:
+                notification.status = 'sent'
+                notification.sent_at = now
+        await session.commit()
+
+        return {'sent': sent, 'failed': len(failed_ids)}
+
     @staticmethod
     async def _send_email_notification(
         to_email: str,
         to_name: str,
         subject: str,
         message: str,
-        action_url: Optional[str] = None
+        action_url: Optional[str] = None,
+        smtp: Optional[_SmtpSession] = None
     ) -> bool:
         """
         Send email notification
@@ -167,71 +680,22 @@ class NotificationService:
             subject: Email subject
             message: Email message
             action_url: Optional action URL
+            smtp: Shared SMTP session; without one the email is only logged
 
         Returns:
             True if sent successfully
         """
         try:
-            # Create email
-            msg = MIMEMultipart('alternative')
-            msg['From'] = NotificationService.FROM_EMAIL
+            msg = NotificationService._build_email(subject, message, action_url)
             msg['To'] = f"{to_name} <{to_email}>"
-            msg['Subject'] = subject
-
-            # Create HTML body
-            html_body = f"""
-            <html>
-            <head>
-                <style>
-                    body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                    .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                    .header {{ background-color: #4CAF50; color: white; padding: 20px; text-align: center; }}
-                    .content {{ padding: 20px; background-color: #f9f9f9; }}
-                    .button {{ display: inline-block; padding: 10px 20px; background-color: #4CAF50;
-                              color: white; text-decoration: none; border-radius: 5px; margin-top: 20px; }}
-                    .footer {{ padding: 20px; text-align: center; font-size: 12px; color: #666; }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h1>Mathvidya</h1>
-                    </div>
-                    <div class="content">
-                        <h2>{subject}</h2>
-                        <p>{message}</p>
-                        {f'<a href="{action_url}" class="button">View Details</a>' if action_url else ''}
-                    </div>
-                    <div class="footer">
-                        <p>© 2025 Mathvidya. All rights reserved.</p>
-                        <p>This is an automated email. Please do not reply.</p>
-                    </div>
-                </div>
-            </body>
-            </html>
-            """
-
-            # Create plain text alternative
-            text_body = f"{subject}\n\n{message}"
-            if action_url:
-                text_body += f"\n\nView details: {action_url}"
-
-            # Attach parts
-            part1 = MIMEText(text_body, 'plain')
-            part2 = MIMEText(html_body, 'html')
-            msg.attach(part1)
-            msg.attach(part2)
-
-            # Send email (in production, use proper email service)
-            # For now, just log and return success
+
             print(f"[EMAIL] To: {to_email}, Subject: {subject}")
             print(f"[EMAIL] Message: {message}")
 
-            # Uncomment to actually send emails:
-            # with smtplib.SMTP(NotificationService.SMTP_HOST, NotificationService.SMTP_PORT) as server:
-            #     server.starttls()
-            #     server.login(NotificationService.SMTP_USER, NotificationService.SMTP_PASSWORD)
-            #     server.send_message(msg)
+            # Only batch sends (send_pending_notifications) deliver, over one
+            # shared connection; one-off sends just log for now
+            if smtp is not None:
+                await smtp.send_message(msg)
 
             return True
 
@@ -239,11 +703,33 @@ class NotificationService:
             print(f"[EMAIL ERROR] Failed to send email to {to_email}: {e}")
             return False
 
+    @staticmethod
+    async def _create_and_queue(
+        session: AsyncSession,
+        request: CreateNotificationRequest,
+        batch: Optional[List[CreateNotificationRequest]] = None
+    ) -> Optional[Notification]:
+        """
+        Create a pending notification, or queue the request on batch
+
+        Delivery happens off the request path: the send_pending_notifications
+        Celery task drains pending notifications every minute.
+
+        When a batch list is given the request is only appended to it, so the
+        caller can create the whole fan-out with bulk_create_notifications.
+        """
+        if batch is not None:
+            batch.append(request)
+            return None
+
+        return await NotificationService.create_notification(session, request)
+
     @staticmethod
     async def send_evaluation_complete_alert(
         session: AsyncSession,
-        alert: EvaluationCompleteAlert
-    ) -> Notification:
+        alert: EvaluationCompleteAlert,
+        batch: Optional[List[CreateNotificationRequest]] = None
+    ) -> Optional[Notification]:
         """Send evaluation completion notification"""
         request = CreateNotificationRequest(
             user_id=alert.student_user_id,
@@ -262,15 +748,14 @@ class NotificationService:
             action_url=f"/student/exams/{alert.exam_instance_id}/results"
         )
 
-        notification = await NotificationService.create_notification(session, request)
-        await NotificationService.send_notification(session, notification)
-        return notification
+        return await NotificationService._create_and_queue(session, request, batch)
 
     @staticmethod
     async def send_sla_reminder_alert(
         session: AsyncSession,
-        alert: SLAReminderAlert
-    ) -> Notification:
+        alert: SLAReminderAlert,
+        batch: Optional[List[CreateNotificationRequest]] = None
+    ) -> Optional[Notification]:
         """Send SLA deadline reminder to teacher"""
         request = CreateNotificationRequest(
             user_id=alert.teacher_user_id,
@@ -289,15 +774,31 @@ class NotificationService:
             action_url=f"/teacher/evaluations/{alert.evaluation_id}"
         )
 
-        notification = await NotificationService.create_notification(session, request)
-        await NotificationService.send_notification(session, notification)
-        return notification
+        return await NotificationService._create_and_queue(session, request, batch)
+
+    @staticmethod
+    async def bulk_send_sla_reminders(
+        session: AsyncSession,
+        alerts: List[SLAReminderAlert]
+    ) -> List[Notification]:
+        """
+        Create SLA reminders for many teachers with one multi-row INSERT
+
+        Preferences still apply; the emails go out with the next pending
+        notification batch over a shared SMTP connection.
+        """
+        batch: List[CreateNotificationRequest] = []
+        for alert in alerts:
+            await NotificationService.send_sla_reminder_alert(session, alert, batch)
+
+        return await NotificationService.bulk_create_notifications(session, batch)
 
     @staticmethod
     async def send_sla_breach_alert(
         session: AsyncSession,
-        alert: SLABreachAlert
-    ) -> Notification:
+        alert: SLABreachAlert,
+        batch: Optional[List[CreateNotificationRequest]] = None
+    ) -> Optional[Notification]:
         """Send SLA breach notification"""
         request = CreateNotificationRequest(
             user_id=alert.teacher_user_id,
@@ -315,15 +816,14 @@ class NotificationService:
             action_url=f"/teacher/evaluations/{alert.evaluation_id}"
         )
 
-        notification = await NotificationService.create_notification(session, request)
-        await NotificationService.send_notification(session, notification)
-        return notification
+        return await NotificationService._create_and_queue(session, request, batch)
 
     @staticmethod
     async def send_subscription_expiring_alert(
         session: AsyncSession,
-        alert: SubscriptionExpiringAlert
-    ) -> Notification:
+        alert: SubscriptionExpiringAlert,
+        batch: Optional[List[CreateNotificationRequest]] = None
+    ) -> Optional[Notification]:
         """Send subscription expiring notification"""
         request = CreateNotificationRequest(
             user_id=alert.user_id,
@@ -341,15 +841,14 @@ class NotificationService:
             action_url="/student/subscription"
         )
 
-        notification = await NotificationService.create_notification(session, request)
-        await NotificationService.send_notification(session, notification)
-        return notification
+        return await NotificationService._create_and_queue(session, request, batch)
 
     @staticmethod
     async def send_exam_limit_warning_alert(
         session: AsyncSession,
-        alert: ExamLimitWarningAlert
-    ) -> Notification:
+        alert: ExamLimitWarningAlert,
+        batch: Optional[List[CreateNotificationRequest]] = None
+    ) -> Optional[Notification]:
         """Send exam limit warning"""
         request = CreateNotificationRequest(
             user_id=alert.user_id,
@@ -367,9 +866,7 @@ class NotificationService:
             action_url="/student/subscription"
         )
 
-        notification = await NotificationService.create_notification(session, request)
-        await NotificationService.send_notification(session, notification)
-        return notification
+        return await NotificationService._create_and_queue(session, request, batch)
 
     @staticmethod
     async def get_user_notifications(
@@ -386,48 +883,61 @@ class NotificationService:
         Returns:
             Tuple of (notifications, total_count, unread_count)
         """
-        # Build query
-        query = select(Notification).where(Notification.user_id == user_id)
+        conditions = [
+            Notification.user_id == user_id,
+            # Filter out expired notifications
+            or_(
+                Notification.expires_at == None,
+                Notification.expires_at > datetime.utcnow()
+            )
+        ]
 
         # Filter by read status
         if is_read is not None:
-            query = query.where(Notification.is_read == is_read)
+            conditions.append(Notification.is_read == is_read)
 
         # Filter by category
         if category:
-            query = query.where(Notification.category == category)
-
-        # Filter out expired notifications
-        query = query.where(
-            or_(
-                Notification.expires_at == None,
-                Notification.expires_at > datetime.utcnow()
-            )
+            conditions.append(Notification.category == category)
+
+        # Page of notifications with the total count as a window column
+        query = (
+            select(Notification, func.count().over().label('total'))
+            .where(*conditions)
+            .order_by(Notification.created_at.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size)
         )
-
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await session.execute(count_query)
-        total_count = total_result.scalar()
-
-        # Get unread count
         unread_query = select(func.count()).where(
             and_(
                 Notification.user_id == user_id,
                 Notification.is_read == False
             )
         )
-        unread_result = await session.execute(unread_query)
+
+        # The unread count doesn't depend on the page, so run it alongside.
+        # An AsyncSession can't run two statements at once; use a second
+        # short-lived session on the same engine for it.
+        async with AsyncSession(session.bind) as unread_session:
+            result, unread_result = await asyncio.gather(
+                session.execute(query),
+                unread_session.execute(unread_query)
+            )
         unread_count = unread_result.scalar()
 
-        # Paginate
-        query = query.order_by(Notification.created_at.desc())
-        query = query.offset((page - 1) * page_size).limit(page_size)
+        rows = result.all()
+        notifications = [row[0] for row in rows]
 
-        result = await session.execute(query)
-        notifications = result.scalars().all()
+        if rows:
+            total_count = rows[0].total
+        elif page > 1:
+            # Past the last page: the window count has no row to ride on
+            count_query = select(func.count()).select_from(Notification).where(*conditions)
+            total_count = (await session.execute(count_query)).scalar()
+        else:
+            total_count = 0
 
-        return list(notifications), total_count, unread_count
+        return notifications, total_count, unread_count
 
     @staticmethod
     async def mark_notifications_read(
@@ -441,16 +951,20 @@ class NotificationService:
         Returns:
             Number of notifications marked as read
         """
-        count = 0
-        for notification_id in notification_ids:
-            notification = await session.get(Notification, notification_id)
-            if notification and str(notification.user_id) == user_id:
-                notification.is_read = True
-                notification.read_at = datetime.utcnow()
-                count += 1
+        # One UPDATE; the user_id filter skips other users' notifications
+        result = await session.execute(
+            update(Notification)
+            .where(
+                Notification.notification_id.in_(notification_ids),
+                Notification.user_id == user_id
+            )
+            .values(is_read=True, read_at=func.now())
+            .returning(Notification.notification_id)
+        )
+        marked_ids = result.scalars().all()
 
         await session.commit()
-        return count
+        return len(marked_ids)
 
     @staticmethod
     async def _get_user_preferences(
@@ -465,68 +979,53 @@ class NotificationService:
         preferences = result.scalar_one_or_none()
 
         if not preferences:
-            # Create default preferences
-            preferences = NotificationPreference(
-                preference_id=uuid4(),
-                user_id=user_id,
-                email_enabled=True,
-                sms_enabled=False,
-                in_app_enabled=True,
-                push_enabled=False,
-                evaluation_complete=True,
-                sla_reminders=True,
-                subscription_alerts=True,
-                performance_reports=True,
-                parent_updates=True,
-                system_announcements=True,
-                daily_digest=False,
-                weekly_digest=False,
-                updated_at=datetime.utcnow()
+            # Create default preferences. ON CONFLICT covers a concurrent first
+            # notification for the same user; the caller owns the commit.
+            insert_query = (
+                pg_insert(NotificationPreference)
+                .values(user_id=user_id, **_DEFAULT_PREFERENCES)
+                .on_conflict_do_nothing(index_elements=['user_id'])
+                .returning(NotificationPreference)
             )
-            session.add(preferences)
-            await session.commit()
+            preferences = (await session.scalars(insert_query)).one_or_none()
+            if preferences is None:
+                result = await session.execute(query)
+                preferences = result.scalar_one()
 
         return preferences
 
+    @staticmethod
+    async def _get_cached_preferences(
+        session: AsyncSession,
+        user_id: str
+    ) -> Dict[str, bool]:
+        """Read-only preference flags, served from a short TTL cache"""
+        cached = _preferences_cache.get(str(user_id))
+        if cached and time.monotonic() - cached[0] < _PREFERENCES_CACHE_TTL_SECONDS:
+            return cached[1]
+
+        preferences = await NotificationService._get_user_preferences(session, user_id)
+        flags = _preference_flags(preferences)
+        _cache_preferences(user_id, flags)
+        return flags
+
     @staticmethod
     def _filter_by_preferences(
         notification_types: List[NotificationType],
         category: NotificationCategory,
-        preferences: NotificationPreference
+        preferences: Dict[str, bool]
     ) -> List[NotificationType]:
-        """Filter notification types based on user preferences"""
-        allowed = []
-
-        # Check if category is enabled
-        category_enabled = True
-        if category == NotificationCategory.EVALUATION_COMPLETE:
-            category_enabled = preferences.evaluation_complete
-        elif category in [NotificationCategory.SLA_REMINDER, NotificationCategory.SLA_BREACH]:
-            category_enabled = preferences.sla_reminders
-        elif category in [NotificationCategory.SUBSCRIPTION_EXPIRING, NotificationCategory.SUBSCRIPTION_EXPIRED]:
-            category_enabled = preferences.subscription_alerts
-        elif category == NotificationCategory.PERFORMANCE_REPORT:
-            category_enabled = preferences.performance_reports
-        elif category == NotificationCategory.PARENT_UPDATE:
-            category_enabled = preferences.parent_updates
-        elif category == NotificationCategory.SYSTEM_ANNOUNCEMENT:
-            category_enabled = preferences.system_announcements
-
-        if not category_enabled:
+        """Filter notification types based on user preference flags"""
+        # Check if category is enabled (categories without a switch always are)
+        category_attr = _CATEGORY_PREF_ATTR.get(category)
+        if category_attr and not preferences[category_attr]:
             return []
 
         # Filter by channel preferences
-        for nt in notification_types:
-            if nt == NotificationType.EMAIL and preferences.email_enabled:
-                allowed.append(nt)
-            elif nt == NotificationType.SMS and preferences.sms_enabled:
-                allowed.append(nt)
-            elif nt == NotificationType.IN_APP and preferences.in_app_enabled:
-                allowed.append(nt)
-            elif nt == NotificationType.PUSH and preferences.push_enabled:
-                allowed.append(nt)
-
-        return allowed
+        return [
+            nt for nt in notification_types
+            if preferences[_CHANNEL_PREF_ATTR[nt]]
+        ]
 
     @staticmethod
     async def update_user_preferences(
@@ -542,52 +1041,55 @@ class NotificationService:
             if hasattr(preferences, key):
                 setattr(preferences, key, value)
 
-        preferences.updated_at = datetime.utcnow()
+        # updated_at comes back from the UPDATE's RETURNING (eager_defaults)
         await session.commit()
-        await session.refresh(preferences)
+        invalidate_preferences_cache(user_id)
 
         return preferences
 
     @staticmethod
     async def get_notification_stats(
-        session: AsyncSession
+        session: AsyncSession,
+        precise: bool = False
     ) -> Dict[str, Any]:
-        """Get notification statistics (admin only)"""
-        # Total notifications
-        total_query = select(func.count()).select_from(Notification)
-        total_result = await session.execute(total_query)
-        total_sent = total_result.scalar()
-
-        # By status
-        pending_query = select(func.count()).where(Notification.status == 'pending')
-        pending_result = await session.execute(pending_query)
-        total_pending = pending_result.scalar()
-
-        failed_query = select(func.count()).where(Notification.status == 'failed')
-        failed_result = await session.execute(failed_query)
-        total_failed = failed_result.scalar()
+        """
+        Get notification statistics (admin only)
 
-        # By type (simplified - would need array operations for accurate count)
-        sent_query = select(func.count()).where(Notification.status == 'sent')
-        sent_result = await session.execute(sent_query)
+        The full-table counts are cached for a minute; pass precise=True to
+        bypass the cache.
+        """
+        global _stats_cache
+        if not precise and _stats_cache and time.monotonic() - _stats_cache[0] < _STATS_CACHE_TTL_SECONDS:
+            return dict(_stats_cache[1])
+
+        # Totals by status and read state in one pass over the table
+        totals_query = select(
+            func.count(),
+            func.count().filter(Notification.status == 'pending'),
+            func.count().filter(Notification.status == 'failed'),
+            func.count().filter(Notification.is_read == True)
+        ).select_from(Notification)
 
         # By category
         category_query = select(
             Notification.category,
             func.count(Notification.notification_id)
         ).group_by(Notification.category)
-        category_result = await session.execute(category_query)
+
+        # Independent aggregates; run them concurrently on two sessions
+        async with AsyncSession(session.bind) as category_session:
+            totals_result, category_result = await asyncio.gather(
+                session.execute(totals_query),
+                category_session.execute(category_query)
+            )
+        total_sent, total_pending, total_failed, total_read = totals_result.one()
         by_category = {row[0]: row[1] for row in category_result}
 
         # Calculate rates
         delivery_rate = (total_sent - total_failed) / total_sent if total_sent > 0 else 0
-
-        read_query = select(func.count()).where(Notification.is_read == True)
-        read_result = await session.execute(read_query)
-        total_read = read_result.scalar()
         read_rate = total_read / total_sent if total_sent > 0 else 0
 
-        return {
+        stats = {
             'total_sent': total_sent,
             'total_pending': total_pending,
             'total_failed': total_failed,
@@ -599,6 +1101,8 @@ class NotificationService:
             'delivery_rate': delivery_rate,
             'read_rate': read_rate
         }
+        _stats_cache = (time.monotonic(), stats)
+        return dict(stats)
 
 
 # Singleton instance
@@ -5,13 +5,51 @@ Business logic for question bank management.
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, update
+from sqlalchemy import select, insert, and_, or_, func, update, tuple_
+from sqlalchemy.orm import load_only
 from typing import List, Optional, Tuple, Dict
 from datetime import datetime, timezone
 import uuid
 
 from models import Question
 from models.enums import QuestionType, QuestionDifficulty, QuestionStatus
+from services.exam_service import invalidate_question_pool_cache
+
+
+# Equality filters for search_questions, in a fixed order so the same set of
+# filters always builds the same statement (one compiled-cache entry)
+_SEARCH_EQUALITY_FILTERS = (
+    ('question_type', Question.question_type),
+    ('class_level', Question.class_level),
+    ('unit', Question.unit),
+    ('chapter', Question.chapter),
+    ('difficulty', Question.difficulty),
+    ('status', Question.status),
+)
+
+# Columns the question list shows; search_questions(summary_only=True) loads
+# only these
+_SEARCH_SUMMARY_COLUMNS = (
+    Question.question_type,
+    Question.class_level,
+    Question.unit,
+    Question.question_text,
+    Question.marks,
+    Question.difficulty,
+    Question.status,
+    Question.is_verified,
+    Question.created_at,
+)
+
+# Dimension bits for get_question_stats, in grouping() argument order (first
+# is the high bit). grouping() sets a bit when that column is NOT part of the
+# row's group, so the stats loop inverts it against _ALL_GROUPED first.
+_GROUPED_BY_TYPE = 0b10000
+_GROUPED_BY_CLASS = 0b01000
+_GROUPED_BY_STATUS = 0b00100
+_GROUPED_BY_DIFFICULTY = 0b00010
+_GROUPED_BY_UNIT = 0b00001
+_ALL_GROUPED = 0b11111
 
 
 class QuestionService:
@@ -56,6 +94,7 @@ class QuestionService:
 
         session.add(question)
         await session.commit()
+        invalidate_question_pool_cache()
         await session.refresh(question)
 
         return question
@@ -75,6 +114,26 @@ class QuestionService:
         Returns:
             Question or None
         """
+        return await QuestionService._get_question(session, question_id)
+
+    @staticmethod
+    async def _get_question(
+        session: AsyncSession,
+        question_id
+    ) -> Optional[Question]:
+        """
+        Load a question through the session's identity map
+
+        Routes pass IDs as strings, but the identity map is keyed by UUID, so
+        a string lookup always goes to the database even when the question
+        is already loaded (e.g. get_question_by_id then verify_question in
+        one request). Converting first lets repeat lookups skip the query.
+        """
+        if not isinstance(question_id, uuid.UUID):
+            try:
+                question_id = uuid.UUID(str(question_id))
+            except ValueError:
+                return None
         return await session.get(Question, question_id)
 
     @staticmethod
@@ -96,7 +155,7 @@ class QuestionService:
         Returns:
             Updated Question or None
         """
-        question = await session.get(Question, question_id)
+        question = await QuestionService._get_question(session, question_id)
         if not question:
             return None
 
@@ -110,6 +169,7 @@ class QuestionService:
         question.updated_at = datetime.now(timezone.utc)
 
         await session.commit()
+        invalidate_question_pool_cache()
         await session.refresh(question)
 
         return question
@@ -129,7 +189,7 @@ class QuestionService:
         Returns:
             True if successful
         """
-        question = await session.get(Question, question_id)
+        question = await QuestionService._get_question(session, question_id)
         if not question:
             return False
 
@@ -137,6 +197,7 @@ class QuestionService:
         question.updated_at = datetime.now(timezone.utc)
 
         await session.commit()
+        invalidate_question_pool_cache()
         return True
 
     @staticmethod
@@ -154,7 +215,7 @@ class QuestionService:
         Returns:
             Updated Question or None
         """
-        question = await session.get(Question, question_id)
+        question = await QuestionService._get_question(session, question_id)
         if not question:
             return None
 
@@ -162,6 +223,7 @@ class QuestionService:
         question.updated_at = datetime.now(timezone.utc)
 
         await session.commit()
+        invalidate_question_pool_cache()
         await session.refresh(question)
 
         return question
@@ -171,7 +233,8 @@ class QuestionService:
         session: AsyncSession,
         filters: dict,
         page: int = 1,
-        page_size: int = 20
+        page_size: int = 20,
+        summary_only: bool = False
     ) -> Tuple[List[Question], int]:
         """
         Search questions with filters and pagination
@@ -181,6 +244,8 @@ class QuestionService:
             filters: Search criteria
             page: Page number (1-indexed)
             page_size: Results per page
+            summary_only: Load only the list columns (_SEARCH_SUMMARY_COLUMNS);
+                other attributes are left unloaded and must not be accessed
 
         Returns:
             Tuple of (questions list, total count)
@@ -188,32 +253,20 @@ class QuestionService:
         # Build query conditions
         conditions = []
 
-        if filters.get('question_type'):
-            conditions.append(Question.question_type == filters['question_type'])
-
-        if filters.get('class_level'):
-            conditions.append(Question.class_level == filters['class_level'])
-
-        if filters.get('unit'):
-            conditions.append(Question.unit == filters['unit'])
-
-        if filters.get('chapter'):
-            conditions.append(Question.chapter == filters['chapter'])
-
-        if filters.get('difficulty'):
-            conditions.append(Question.difficulty == filters['difficulty'])
-
-        if filters.get('status'):
-            conditions.append(Question.status == filters['status'])
+        for key, column in _SEARCH_EQUALITY_FILTERS:
+            if filters.get(key):
+                conditions.append(column == filters[key])
 
         if filters.get('search_text'):
+            # Substring match, served by the idx_questions_text_trgm index
             search_term = f"%{filters['search_text']}%"
             conditions.append(Question.question_text.ilike(search_term))
 
         if filters.get('tags'):
-            # Search for any of the provided tags
-            for tag in filters['tags']:
-                conditions.append(Question.tags.contains([tag]))
+            # Questions carrying all of the provided tags; one array bind
+            # keeps the statement shape (and its cache entry) the same
+            # however many tags are given
+            conditions.append(Question.tags.contains(list(filters['tags'])))
 
         if filters.get('is_verified') is not None:
             conditions.append(Question.is_verified == filters['is_verified'])
@@ -222,25 +275,31 @@ class QuestionService:
         if filters.get('status') != 'archived' and not filters.get('include_archived'):
             conditions.append(Question.status != 'archived')
 
-        # Build base query
-        base_query = select(Question)
-        if conditions:
-            base_query = base_query.where(and_(*conditions))
-
-        # Get total count
-        count_query = select(func.count()).select_from(Question)
-        if conditions:
-            count_query = count_query.where(and_(*conditions))
-
-        count_result = await session.execute(count_query)
-        total = count_result.scalar()
-
-        # Get paginated results
+        # Page of questions with the total count as a window column
         offset = (page - 1) * page_size
-        query = base_query.order_by(Question.created_at.desc()).limit(page_size).offset(offset)
+        query = (
+            select(Question, func.count().over().label('total'))
+            .where(*conditions)
+            .order_by(Question.created_at.desc())
+            .limit(page_size)
+            .offset(offset)
+        )
+        if summary_only:
+            # Skip options, answers and marking schemes the list never shows
+            query = query.options(load_only(*_SEARCH_SUMMARY_COLUMNS))
 
         result = await session.execute(query)
-        questions = result.scalars().all()
+        rows = result.all()
+        questions = [row[0] for row in rows]
+
+        if rows:
+            total = rows[0].total
+        elif page > 1:
+            # Past the last page: the window count has no row to ride on
+            count_query = select(func.count()).select_from(Question).where(*conditions)
+            total = (await session.execute(count_query)).scalar()
+        else:
+            total = 0
 
         return questions, total
 
@@ -257,103 +316,66 @@ class QuestionService:
         Returns:
             Dictionary with statistics
         """
-        # Total questions
-        total_result = await session.execute(
-            select(func.count()).select_from(Question)
+        # Every breakdown in one scan: GROUPING SETS emits one group of rows
+        # per dimension, and grouping() says which set a row belongs to (a
+        # plain NULL check can't, since unit/difficulty may themselves be NULL)
+        dimensions = (
+            Question.question_type,
+            Question.class_level,
+            Question.status,
+            Question.difficulty,
+            Question.unit,
         )
-        total_questions = total_result.scalar()
-
-        # By type
-        type_result = await session.execute(
+        result = await session.execute(
             select(
-                Question.question_type,
-                func.count(Question.question_id)
-            ).group_by(Question.question_type)
+                *dimensions,
+                func.grouping(*dimensions).label('grouping'),
+                func.count().label('total'),
+                func.count().filter(Question.is_verified == True).label('verified'),
+                func.count().filter(Question.is_verified == False).label('unverified')
+            )
+            .group_by(func.grouping_sets(
+                *dimensions,
+                tuple_(Question.unit, Question.question_type),
+                tuple_()
+            ))
+            .order_by(func.count().desc())
         )
-        by_type = {row[0]: row[1] for row in type_result}
 
-        # By class
-        class_result = await session.execute(
-            select(
-                Question.class_level,
-                func.count(Question.question_id)
-            ).group_by(Question.class_level)
-        )
-        by_class = {row[0]: row[1] for row in class_result}
-
-        # By status
-        status_result = await session.execute(
-            select(
-                Question.status,
-                func.count(Question.question_id)
-            ).group_by(Question.status)
-        )
-        by_status = {row[0]: row[1] for row in status_result}
-
-        # By difficulty
-        difficulty_result = await session.execute(
-            select(
-                Question.difficulty,
-                func.count(Question.question_id)
-            ).group_by(Question.difficulty)
-        )
-        by_difficulty = {row[0]: row[1] for row in difficulty_result}
-
-        # By unit (all units, not limited)
-        unit_result = await session.execute(
-            select(
-                Question.unit,
-                func.count(Question.question_id)
-            ).group_by(Question.unit)
-            .order_by(func.count(Question.question_id).desc())
-        )
-        by_unit = {row[0]: row[1] for row in unit_result}
-
-        # By unit and type (for detailed breakdown)
-        unit_type_result = await session.execute(
-            select(
-                Question.unit,
-                Question.question_type,
-                func.count(Question.question_id)
-            ).group_by(Question.unit, Question.question_type)
-        )
+        total_questions = 0
+        total_verified = 0
+        total_unverified = 0
+        by_type = {}
+        by_class = {}
+        by_status = {}
+        by_difficulty = {}
+        by_unit = {}
         by_unit_type = {}
-        for row in unit_type_result:
-            unit, qtype, count = row
-            if unit not in by_unit_type:
-                by_unit_type[unit] = {}
-            by_unit_type[unit][qtype] = count
-
-        # Verified vs Unverified counts
-        verified_result = await session.execute(
-            select(func.count()).select_from(Question).where(Question.is_verified == True)
-        )
-        total_verified = verified_result.scalar() or 0
-
-        unverified_result = await session.execute(
-            select(func.count()).select_from(Question).where(Question.is_verified == False)
-        )
-        total_unverified = unverified_result.scalar() or 0
-
-        # By unit - unverified counts
-        unit_unverified_result = await session.execute(
-            select(
-                Question.unit,
-                func.count(Question.question_id)
-            ).where(Question.is_verified == False)
-            .group_by(Question.unit)
-        )
-        by_unit_unverified = {row[0]: row[1] for row in unit_unverified_result}
-
-        # By class - unverified counts
-        class_unverified_result = await session.execute(
-            select(
-                Question.class_level,
-                func.count(Question.question_id)
-            ).where(Question.is_verified == False)
-            .group_by(Question.class_level)
-        )
-        by_class_unverified = {row[0]: row[1] for row in class_unverified_result}
+        by_unit_unverified = {}
+        by_class_unverified = {}
+
+        for row in result:
+            mask = _ALL_GROUPED ^ row.grouping
+            if mask == 0:
+                total_questions = row.total
+                total_verified = row.verified
+                total_unverified = row.unverified
+            elif mask == _GROUPED_BY_TYPE:
+                by_type[row.question_type] = row.total
+            elif mask == _GROUPED_BY_CLASS:
+                by_class[row.class_level] = row.total
+                if row.unverified:
+                    by_class_unverified[row.class_level] = row.unverified
+            elif mask == _GROUPED_BY_STATUS:
+                by_status[row.status] = row.total
+            elif mask == _GROUPED_BY_DIFFICULTY:
+                by_difficulty[row.difficulty] = row.total
+            elif mask == _GROUPED_BY_UNIT:
+                by_unit[row.unit] = row.total
+                if row.unverified:
+                    by_unit_unverified[row.unit] = row.unverified
+            elif mask == _GROUPED_BY_UNIT | _GROUPED_BY_TYPE:
+                by_unit_type.setdefault(row.unit, {})[row.question_type] = row.total
 
         return {
             'total_questions': total_questions,
@@ -388,7 +410,7 @@ class QuestionService:
         Returns:
             New Question or None
         """
-        original = await session.get(Question, question_id)
+        original = await QuestionService._get_question(session, question_id)
         if not original:
             return None
 
@@ -421,6 +443,7 @@ class QuestionService:
 
         session.add(cloned)
         await session.commit()
+        invalidate_question_pool_cache()
         await session.refresh(cloned)
 
         return cloned
@@ -442,33 +465,30 @@ class QuestionService:
         Returns:
             Tuple of (created questions, errors)
         """
-        created_questions = []
+        rows = []
         errors = []
 
         for idx, q_data in enumerate(questions_data):
             try:
-                question = Question(
-                    question_type=q_data['question_type'],
-                    class_level=q_data['class_level'],
-                    unit=q_data['unit'],
-                    chapter=q_data.get('chapter'),
-                    topic=q_data.get('topic'),
-                    question_text=q_data['question_text'],
-                    question_image_url=q_data.get('question_image_url'),
-                    options=q_data.get('options'),
-                    correct_option=q_data.get('correct_option'),
-                    model_answer=q_data.get('model_answer'),
-                    marking_scheme=q_data.get('marking_scheme'),
-                    marks=q_data['marks'],
-                    difficulty=q_data.get('difficulty', QuestionDifficulty.MEDIUM.value),
-                    tags=q_data.get('tags', []),
-                    created_by_user_id=created_by_user_id,
-                    status=QuestionStatus.ACTIVE.value,  # Start as active
-                    version=1
-                )
-
-                session.add(question)
-                created_questions.append(question)
+                rows.append({
+                    'question_type': q_data['question_type'],
+                    'class_level': q_data['class_level'],
+                    'unit': q_data['unit'],
+                    'chapter': q_data.get('chapter'),
+                    'topic': q_data.get('topic'),
+                    'question_text': q_data['question_text'],
+                    'question_image_url': q_data.get('question_image_url'),
+                    'options': q_data.get('options'),
+                    'correct_option': q_data.get('correct_option'),
+                    'model_answer': q_data.get('model_answer'),
+                    'marking_scheme': q_data.get('marking_scheme'),
+                    'marks': q_data['marks'],
+                    'difficulty': q_data.get('difficulty', QuestionDifficulty.MEDIUM.value),
+                    'tags': q_data.get('tags', []),
+                    'created_by_user_id': created_by_user_id,
+                    'status': QuestionStatus.ACTIVE.value,  # Start as active
+                    'version': 1
+                })
 
             except Exception as e:
                 errors.append({
@@ -477,10 +497,17 @@ class QuestionService:
                     'question_text': q_data.get('question_text', 'N/A')[:50]
                 })
 
-        if created_questions:
+        created_questions = []
+        if rows:
+            # One executemany INSERT ... RETURNING instead of a flush per
+            # question plus a refresh per question
+            result = await session.scalars(
+                insert(Question).returning(Question, sort_by_parameter_order=True),
+                rows
+            )
+            created_questions = result.all()
             await session.commit()
-            for q in created_questions:
-                await session.refresh(q)
+            invalidate_question_pool_cache()
 
         return created_questions, errors
 
@@ -557,7 +584,7 @@ class QuestionService:
         Returns:
             Updated Question or None
         """
-        question = await session.get(Question, question_id)
+        question = await QuestionService._get_question(session, question_id)
         if not question:
             return None
 
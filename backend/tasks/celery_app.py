@@ -13,7 +13,7 @@ celery_app = Celery(
     "mathvidya",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
-    include=["tasks.sla_tasks", "tasks.analytics_tasks"]  # Import task modules
+    include=["tasks.sla_tasks", "tasks.analytics_tasks", "tasks.notification_tasks"]  # Import task modules
 )
 
 # Celery configuration
@@ -36,6 +36,7 @@ celery_app.conf.task_routes = {
     "tasks.sla_tasks.detect_sla_breaches": {"queue": "evaluation", "priority": 9},
     "tasks.analytics_tasks.refresh_leaderboard": {"queue": "analytics", "priority": 3},
     "tasks.analytics_tasks.aggregate_daily_stats": {"queue": "analytics", "priority": 3},
+    "tasks.notification_tasks.send_pending_notifications": {"queue": "notifications", "priority": 6},
 }
 
 # Periodic tasks (Celery Beat schedule)
@@ -45,6 +46,11 @@ celery_app.conf.beat_schedule = {
         "task": "tasks.sla_tasks.detect_sla_breaches",
         "schedule": crontab(minute="*/15"),
     },
+    # Send queued notifications every minute
+    "send-pending-notifications": {
+        "task": "tasks.notification_tasks.send_pending_notifications",
+        "schedule": crontab(minute="*"),
+    },
     # Refresh leaderboard every hour
     "refresh-leaderboard": {
         "task": "tasks.analytics_tasks.refresh_leaderboard",
@@ -0,0 +1,56 @@
+"""
+Notification Celery Tasks
+
+Background delivery of queued notifications, off the request path.
+"""
+
+from celery import shared_task
+import asyncio
+import logging
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Notifications sent per run; the beat schedule picks up the rest next minute
+SEND_BATCH_SIZE = 50
+
+
+async def _send_pending(limit: int) -> dict:
+    from database import engine, AsyncSessionLocal
+    from services.notification_service import NotificationService
+
+    try:
+        async with AsyncSessionLocal() as session:
+            return await NotificationService.send_pending_notifications(session, limit)
+    finally:
+        # Pooled asyncpg connections are tied to this run's event loop
+        await engine.dispose()
+
+
+@shared_task(bind=True, max_retries=3)
+def send_pending_notifications(self, limit: int = SEND_BATCH_SIZE):
+    """
+    Send pending notifications in one batch over a shared SMTP connection.
+
+    Runs every minute via Celery Beat. Notifications are created as pending
+    by the alert helpers, so the database row is the queue entry. Skipped
+    when SMTP credentials aren't configured.
+
+    Args:
+        limit: Maximum notifications to send in this run
+    """
+    # Without credentials every send would fail; leave the queue untouched
+    if not (settings.SMTP_USER and settings.SMTP_PASSWORD):
+        logger.info("SMTP not configured; skipping pending notifications")
+        return {'sent': 0, 'failed': 0}
+
+    try:
+        counts = asyncio.run(_send_pending(limit))
+        logger.info(f"Sent {counts['sent']} notifications ({counts['failed']} failed)")
+        return counts
+
+    except Exception as exc:
+        logger.error(f"Error sending notifications: {exc}")
+        # Retry with exponential backoff
+        raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
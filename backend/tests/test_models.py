@@ -16,6 +16,8 @@ from models.question import Question
 from models.promo_code import PromoCode, PromoCodeUsage, PromoType
 from models.email_verification import EmailVerification
 from models.site_feedback import SiteFeedback, FeedbackCategory, FeedbackStatus
+from models.evaluation import Evaluation
+from models.enums import EvaluationStatus
 
 
 class TestUserModel:
@@ -282,6 +284,36 @@ class TestEmailVerificationModel:
         assert len(set(codes)) >= 8  # Allow for some collisions
 
 
+class TestEvaluationModel:
+    """Tests for the Evaluation model."""
+
+    @pytest.fixture
+    def evaluation(self) -> Evaluation:
+        """Create a test evaluation instance past its SLA deadline."""
+        return Evaluation(
+            evaluation_id=uuid.uuid4(),
+            exam_instance_id=uuid.uuid4(),
+            teacher_user_id=uuid.uuid4(),
+            sla_deadline=datetime.now(timezone.utc) - timedelta(hours=1),
+            sla_hours_allocated=24,
+            status=EvaluationStatus.ASSIGNED.value,
+        )
+
+    def test_overdue_on_instance(self, evaluation: Evaluation):
+        """Test overdue matches is_overdue() on an instance."""
+        assert evaluation.overdue is True
+
+        evaluation.status = EvaluationStatus.COMPLETED.value
+        assert evaluation.overdue is False
+
+    def test_overdue_sql_expression(self):
+        """Test overdue compiles to a SQL predicate on the class."""
+        sql = str(Evaluation.overdue.expression)
+
+        assert "sla_deadline" in sql
+        assert "now()" in sql
+
+
 class TestPromoCodeUsageModel:
     """Tests for the PromoCodeUsage model."""
 
@@ -68,6 +68,532 @@ class TestChatbotService:
         assert normalize_text("UPPERCASE") == "uppercase"
 
 
+class TestFAQChatbotService:
+    """Tests for the rule-based FAQ chatbot."""
+
+    def test_pattern_match_returns_faq(self):
+        """Test that a pattern hit returns the matching FAQ."""
+        from services.chatbot_service import find_matching_faq
+
+        faq, confidence = find_matching_faq("How much does it cost?")
+
+        assert faq is not None
+        assert faq["question"] == "What are the subscription plans and pricing?"
+        assert confidence >= 0.9
+
+    def test_keyword_counts_without_numpy(self, monkeypatch):
+        """Test the pure-Python keyword counts match the NumPy ones."""
+        from services import chatbot_service
+
+        message = "how do i pay for the premium plan and contact support?"
+        expected = [int(n) for n in chatbot_service._keyword_match_counts(message)]
+
+        monkeypatch.setattr(chatbot_service, "np", None)
+        assert chatbot_service._keyword_match_counts(message) == expected
+
+    def test_popular_faq_moves_to_front(self, monkeypatch):
+        """Test that frequently matched FAQs are evaluated first."""
+        from services import chatbot_service
+
+        # Start from fresh counters and restore the module state afterwards
+        monkeypatch.setattr(chatbot_service, "_hit_counts", [0] * len(chatbot_service.FAQ_DATABASE))
+        monkeypatch.setattr(chatbot_service, "_faq_order", list(range(len(chatbot_service.FAQ_DATABASE))))
+        monkeypatch.setattr(chatbot_service, "_calls_since_reorder", 0)
+
+        for _ in range(chatbot_service._REORDER_INTERVAL):
+            chatbot_service.find_matching_faq("How do I contact support?")
+
+        first = chatbot_service.FAQ_DATABASE[chatbot_service._faq_order[0]]
+        assert first["question"] == "How do I contact support?"
+
+
+class TestEvaluationService:
+    """Tests for evaluation service SLA logic."""
+
+    @staticmethod
+    def _hourly_deadline(assigned_at: datetime, sla_hours: int) -> datetime:
+        """Reference implementation: step hour by hour, skipping Sundays."""
+        current = assigned_at
+        hours_remaining = sla_hours
+        while hours_remaining > 0:
+            current = current + timedelta(hours=1)
+            if current.weekday() == 6:
+                continue
+            hours_remaining -= 1
+        return current
+
+    def test_sla_deadline_matches_hourly_walk(self):
+        """Test closed-form SLA deadline against an hour-by-hour walk."""
+        from services.evaluation_service import EvaluationService
+
+        start = datetime(2026, 1, 1, 0, 17, 33, tzinfo=timezone.utc)
+        for step in range(0, 14 * 24 * 2):
+            assigned_at = start + timedelta(minutes=30 * step)
+            for sla_hours in (0, 24, 48):
+                assert EvaluationService.calculate_sla_deadline(
+                    assigned_at, sla_hours
+                ) == self._hourly_deadline(assigned_at, sla_hours)
+
+    def test_sla_deadline_without_sunday_exclusion(self):
+        """Test that disabling Sunday exclusion is plain hour addition."""
+        from services.evaluation_service import EvaluationService
+
+        saturday = datetime(2026, 1, 3, 12, 0, tzinfo=timezone.utc)
+        deadline = EvaluationService.calculate_sla_deadline(
+            saturday, 24, exclude_sundays=False
+        )
+
+        assert deadline == saturday + timedelta(hours=24)
+
+    def test_sla_deadline_skips_sunday(self):
+        """Test that a Saturday assignment rolls over Sunday."""
+        from services.evaluation_service import EvaluationService
+
+        saturday = datetime(2026, 1, 3, 12, 0, tzinfo=timezone.utc)
+        deadline = EvaluationService.calculate_sla_deadline(saturday, 24)
+
+        assert deadline == datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc)
+
+
+class TestExamService:
+    """Tests for exam service caching."""
+
+    @pytest.mark.asyncio
+    async def test_templates_cached_per_class(self):
+        """Test that templates are served from cache within the TTL."""
+        from services.exam_service import ExamService, invalidate_template_cache
+
+        template = MagicMock(
+            template_id=uuid.uuid4(),
+            template_name="Board Exam",
+            exam_type="board_exam",
+            class_level="X",
+            config={"sections": []},
+            is_active=True,
+        )
+        template.get_total_marks.return_value = 80
+        template.get_duration_minutes.return_value = 180
+
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = [template]
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=result)
+
+        invalidate_template_cache()
+        first = await ExamService.get_available_templates(session, "X")
+        second = await ExamService.get_available_templates(session, "X")
+
+        assert first == second
+        assert first[0]["total_marks"] == 80
+        assert session.execute.await_count == 1
+
+        invalidate_template_cache()
+        await ExamService.get_available_templates(session, "X")
+        assert session.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_question_pool_cached_between_exams(self):
+        """Test that repeat exam starts only load the sampled questions."""
+        from services.exam_service import ExamService, invalidate_question_pool_cache
+
+        questions = [MagicMock(question_id=uuid.uuid4()) for _ in range(5)]
+
+        pool_result = MagicMock()
+        pool_result.all.return_value = [("MCQ", 1, q.question_id) for q in questions]
+        load_result = MagicMock()
+        load_result.scalars.return_value.all.return_value = questions
+
+        session = MagicMock()
+        session.execute = AsyncMock(side_effect=[pool_result, load_result, load_result])
+        sections = [{"type": "MCQ", "count": 3, "marks_each": 1}]
+
+        invalidate_question_pool_cache()
+        first, first_ids = await ExamService._generate_exam_questions(session, "X", sections)
+        second, _ = await ExamService._generate_exam_questions(session, "X", sections)
+
+        assert len(first) == 3 and len(second) == 3
+        assert first_ids == [str(q.question_id) for q in first]
+        assert session.execute.await_count == 3
+
+        # The load re-checks status so another worker's archive is honoured
+        load_sql = str(session.execute.await_args_list[1].args[0])
+        assert "questions.status" in load_sql
+
+    @pytest.mark.asyncio
+    async def test_mcq_answer_on_non_mcq_question_is_not_null(self):
+        """Test a save against a question without correct_option grades it incorrect, not NULL."""
+        from sqlalchemy.dialects import postgresql
+        from services.exam_service import ExamService
+
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=MagicMock(rowcount=1))
+        session.commit = AsyncMock()
+
+        # Question 5 of a board exam may be a VSA/SA/LA question
+        await ExamService.save_mcq_answer(
+            session, str(uuid.uuid4()), str(uuid.uuid4()), 5, "B"
+        )
+
+        stmt = session.execute.await_args.args[0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "coalesce(questions.correct_option = " in sql
+        assert "CASE WHEN coalesce(questions.correct_option = " in sql
+        session.commit.assert_awaited_once()
+
+
+class TestInvoiceGenerator:
+    """Tests for invoice GST calculation (no database)."""
+
+    def test_intra_state_gst_split(self):
+        """Test CGST + SGST for Tamil Nadu customers."""
+        from decimal import Decimal
+        from services.invoice_generator import InvoiceGenerator
+
+        gst = InvoiceGenerator(None).calculate_gst(Decimal("423.73"), "Tamil Nadu")
+
+        assert gst["cgst_amount"] == Decimal("38.14")
+        assert gst["sgst_amount"] == Decimal("38.14")
+        assert gst["igst_amount"] == Decimal("0.00")
+        assert gst["igst_rate"] == Decimal("0.00")
+        assert gst["total_gst"] == Decimal("76.28")
+
+    def test_inter_state_igst(self):
+        """Test IGST for customers outside Tamil Nadu."""
+        from decimal import Decimal
+        from services.invoice_generator import InvoiceGenerator
+
+        gst = InvoiceGenerator(None).calculate_gst(500, "Kerala")
+
+        assert gst["igst_rate"] == Decimal("18.00")
+        assert gst["igst_amount"] == Decimal("90.00")
+        assert gst["cgst_amount"] == Decimal("0.00")
+        assert gst["total_gst"] == Decimal("90.00")
+
+    def test_gst_breakdown_memoized(self):
+        """Test repeat amounts reuse the cached breakdown without sharing it."""
+        from decimal import Decimal
+        from services.invoice_generator import InvoiceGenerator
+
+        generator = InvoiceGenerator(None)
+        InvoiceGenerator._intra_state_gst.cache_clear()
+
+        first = generator.calculate_gst(Decimal("847.46"), "Tamil Nadu")
+        first["total_gst"] = Decimal("0.00")
+        second = generator.calculate_gst(Decimal("847.46"), "Tamil Nadu")
+
+        assert InvoiceGenerator._intra_state_gst.cache_info().hits == 1
+        assert second["total_gst"] == Decimal("152.54")
+
+    def test_bulk_invoice_insert_stays_batched(self):
+        """Test invoices.id is an insertmanyvalues sentinel for ordered RETURNING."""
+        from sqlalchemy import insert
+        from sqlalchemy.dialects.postgresql import asyncpg
+        from models import Invoice
+
+        stmt = insert(Invoice.__table__).returning(
+            *Invoice.__table__.c, sort_by_parameter_order=True
+        )
+        compiled = stmt.compile(
+            dialect=asyncpg.dialect(),
+            column_keys=["invoice_number", "payment_id"],
+            for_executemany=True,
+        )
+
+        assert compiled._insertmanyvalues.sentinel_columns == (Invoice.__table__.c.id,)
+
+    def test_only_payment_id_violation_is_duplicate(self):
+        """Test other integrity errors (e.g. foreign keys) aren't reported as duplicates."""
+        from sqlalchemy.exc import IntegrityError
+        from services.invoice_generator import _is_duplicate_payment_invoice
+
+        def integrity_error(constraint_name):
+            driver_error = Exception("violation")
+            driver_error.constraint_name = constraint_name
+            orig = Exception("violation")
+            orig.__cause__ = driver_error
+            return IntegrityError("INSERT INTO invoices ...", {}, orig)
+
+        assert _is_duplicate_payment_invoice(integrity_error("ix_invoices_payment_id"))
+        assert not _is_duplicate_payment_invoice(integrity_error("invoices_subscription_id_fkey"))
+
+
+class TestNotificationService:
+    """Tests for notification delivery helpers (no database)."""
+
+    async def test_smtp_session_reuses_and_recycles_connection(self):
+        """Test one SMTP connection serves a batch and is recycled at the cap."""
+        pytest.importorskip("aiosmtplib")
+        from config.settings import settings
+        from services.notification_service import NotificationService
+
+        with patch("aiosmtplib.SMTP") as mock_smtp, \
+                patch.object(settings, "SMTP_PASSWORD", "app-password"):
+            server = mock_smtp.return_value
+            server.connect = AsyncMock()
+            server.login = AsyncMock()
+            server.send_message = AsyncMock()
+            server.quit = AsyncMock()
+
+            async with NotificationService.smtp_session() as smtp:
+                smtp.MAX_MESSAGES_PER_CONNECTION = 2
+                for _ in range(3):
+                    await smtp.send_message(MagicMock())
+
+        assert mock_smtp.call_count == 2
+        assert server.send_message.await_count == 3
+        assert server.quit.await_count == 2
+
+    async def test_smtp_session_logs_only_without_credentials(self):
+        """Test nothing is sent (or imported) when SMTP isn't configured."""
+        from config.settings import settings
+        from services.notification_service import NotificationService
+
+        with patch.object(settings, "SMTP_PASSWORD", ""):
+            async with NotificationService.smtp_session() as smtp:
+                assert not smtp.enabled
+                await smtp.send_message({"To": "student@example.com"})
+
+        assert smtp._server is None
+
+    def test_send_failure_retried_before_marked_failed(self):
+        """Test failed sends stay pending until the attempt limit."""
+        from services.notification_service import NotificationService
+
+        notification = MagicMock(extra_data={"source": "sla"}, status="pending")
+
+        for _ in range(NotificationService.MAX_SEND_ATTEMPTS - 1):
+            NotificationService._record_send_failure(notification, "timeout")
+            assert notification.status == "pending"
+
+        NotificationService._record_send_failure(notification, "timeout")
+        assert notification.status == "failed"
+        assert notification.extra_data["send_attempts"] == NotificationService.MAX_SEND_ATTEMPTS
+        assert notification.extra_data["source"] == "sla"
+
+    async def test_pending_batch_claimed_and_released(self):
+        """Test the batch is claimed with SKIP LOCKED and unsent rows go back to pending."""
+        from sqlalchemy.dialects import postgresql
+        from services.notification_service import NotificationService
+
+        notifications = [
+            MagicMock(user_id=uuid.uuid4(), status="sending", created_at=datetime(2026, 10, 17, 9, i))
+            for i in range(3)
+        ]
+        claimed = MagicMock()
+        claimed.all.return_value = notifications
+        users = MagicMock()
+        users.scalars.return_value.all.return_value = []
+        session = MagicMock()
+        session.scalars = AsyncMock(return_value=claimed)
+        session.execute = AsyncMock(return_value=users)
+        session.commit = AsyncMock()
+
+        smtp = MagicMock()
+        smtp.__aenter__ = AsyncMock(return_value=smtp)
+        smtp.__aexit__ = AsyncMock(return_value=False)
+
+        async def fail(session, notification, user, smtp):
+            notification.status = "pending"
+            return False
+
+        with patch.object(NotificationService, "smtp_session", return_value=smtp), \
+                patch.object(NotificationService, "send_notification", new=AsyncMock(side_effect=fail)):
+            counts = await NotificationService.send_pending_notifications(session, limit=3)
+
+        claim_sql = str(session.scalars.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "FOR UPDATE SKIP LOCKED" in claim_sql
+        # One failure is a third of the batch, so the run stops after it
+        assert counts == {"sent": 0, "failed": 1}
+        assert all(n.status == "pending" for n in notifications)
+
+    def test_in_app_only_notifications_skip_the_queue(self):
+        """Test only notifications with an email channel are left pending."""
+        from services.notification_service import NotificationService
+        from schemas.notification import NotificationType
+
+        status, sent_at = NotificationService._initial_delivery([NotificationType.IN_APP])
+        assert status == "sent" and sent_at is not None
+
+        status, sent_at = NotificationService._initial_delivery(
+            [NotificationType.EMAIL, NotificationType.IN_APP]
+        )
+        assert status == "pending" and sent_at is None
+
+    def test_filter_by_preferences(self):
+        """Test category switches and channel switches both apply."""
+        from services.notification_service import NotificationService
+        from schemas.notification import NotificationType, NotificationCategory
+
+        from services.notification_service import _DEFAULT_PREFERENCES
+
+        prefs = dict(_DEFAULT_PREFERENCES, sla_reminders=False, email_enabled=False)
+        channels = [NotificationType.EMAIL, NotificationType.IN_APP]
+
+        assert NotificationService._filter_by_preferences(
+            channels, NotificationCategory.SLA_BREACH, prefs
+        ) == []
+        # No preference switch for exam limit warnings; only channels apply
+        assert NotificationService._filter_by_preferences(
+            channels, NotificationCategory.EXAM_LIMIT_WARNING, prefs
+        ) == [NotificationType.IN_APP]
+
+    async def test_bulk_sla_reminders_create_one_batch(self):
+        """Test SLA reminders are collected into a single bulk create."""
+        from services.notification_service import NotificationService
+        from schemas.notification import SLAReminderAlert, NotificationCategory
+
+        alerts = [
+            SLAReminderAlert(
+                teacher_user_id=str(uuid.uuid4()),
+                teacher_name="Teacher",
+                evaluation_id=str(uuid.uuid4()),
+                exam_instance_id=str(uuid.uuid4()),
+                student_name=f"Student {i}",
+                sla_deadline=datetime(2026, 10, 18, 9, 0),
+                hours_remaining=4
+            )
+            for i in range(3)
+        ]
+
+        with patch.object(
+            NotificationService, "bulk_create_notifications", new=AsyncMock(return_value=[])
+        ) as bulk_create:
+            await NotificationService.bulk_send_sla_reminders(MagicMock(), alerts)
+
+        requests = bulk_create.await_args.args[1]
+        assert len(requests) == 3
+        assert all(r.category == NotificationCategory.SLA_REMINDER for r in requests)
+        assert requests[0].user_id == alerts[0].teacher_user_id
+
+    async def test_broadcast_swaps_recipient_only(self):
+        """Test broadcasts are recorded, respect opt-outs and reuse one rendered email."""
+        from services.notification_service import NotificationService
+        from schemas.notification import NotificationCategory
+
+        users = [
+            MagicMock(user_id=uuid.uuid4(), full_name=f"User {i}", email=f"user{i}@example.com")
+            for i in range(3)
+        ]
+        # The third user has email turned off, so only an in-app row exists
+        notifications = [
+            MagicMock(user_id=u.user_id, status="pending", notification_types=["email", "in_app"])
+            for u in users[:2]
+        ] + [MagicMock(user_id=users[2].user_id, status="pending", notification_types=["in_app"])]
+
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = users[:2]
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=result)
+        session.commit = AsyncMock()
+
+        smtp = MagicMock()
+        smtp.send_message = AsyncMock()
+        smtp.__aenter__ = AsyncMock(return_value=smtp)
+        smtp.__aexit__ = AsyncMock(return_value=False)
+
+        with patch.object(NotificationService, "smtp_session", return_value=smtp), \
+                patch.object(
+                    NotificationService, "bulk_create_notifications",
+                    new=AsyncMock(return_value=notifications)
+                ) as bulk_create:
+            result = await NotificationService.send_broadcast(
+                session, [str(u.user_id) for u in users], "Maintenance", "Back at 6 PM"
+            )
+
+        requests = bulk_create.await_args.args[1]
+        assert all(r.category == NotificationCategory.SYSTEM_ANNOUNCEMENT for r in requests)
+        assert result == {"sent": 2, "failed": 0}
+        assert all(n.status == "sent" for n in notifications)
+
+        sent = [call.args[0] for call in smtp.send_message.await_args_list]
+        assert [m["To"] for m in sent] == [f"User {i} <user{i}@example.com>" for i in range(2)]
+        assert all(len(m.get_all("To")) == 1 for m in sent)
+        assert sent[0].get_body(("plain",)).get_content() == sent[1].get_body(("plain",)).get_content()
+
+
+class TestQuestionService:
+    """Tests for question bank queries (no database)."""
+
+    async def test_question_stats_dispatch_grouping_sets(self):
+        """Test each GROUPING SETS row lands in the right breakdown."""
+        from services.question_service import QuestionService
+
+        def row(grouping, total, unverified=0, **columns):
+            values = dict.fromkeys(
+                ("question_type", "class_level", "status", "difficulty", "unit")
+            )
+            values.update(columns)
+            return MagicMock(
+                grouping=grouping, total=total,
+                verified=total - unverified, unverified=unverified, **values
+            )
+
+        rows = [
+            row(0b11111, 10, unverified=4),
+            row(0b01111, 6, question_type="MCQ"),
+            row(0b10111, 10, unverified=4, class_level="XII"),
+            row(0b11011, 10, status="active"),
+            # A NULL difficulty is still a difficulty bucket
+            row(0b11101, 3, difficulty=None),
+            row(0b11110, 7, unverified=0, unit="Calculus"),
+            row(0b01110, 5, unit="Calculus", question_type="MCQ"),
+        ]
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=rows)
+
+        stats = await QuestionService.get_question_stats(session)
+
+        assert session.execute.await_count == 1
+        assert stats["total_questions"] == 10
+        assert stats["total_verified"] == 6
+        assert stats["total_unverified"] == 4
+        assert stats["by_type"] == {"MCQ": 6}
+        assert stats["by_class"] == {"XII": 10}
+        assert stats["by_class_unverified"] == {"XII": 4}
+        assert stats["by_status"] == {"active": 10}
+        assert stats["by_difficulty"] == {None: 3}
+        assert stats["by_unit"] == {"Calculus": 7}
+        assert stats["by_unit_unverified"] == {}
+        assert stats["by_unit_type"] == {"Calculus": {"MCQ": 5}}
+
+    async def test_question_lookup_uses_uuid_identity_key(self):
+        """Test string IDs are converted so the identity map can match them."""
+        from services.question_service import QuestionService
+
+        question_id = uuid.uuid4()
+        session = MagicMock()
+        session.get = AsyncMock()
+
+        await QuestionService.get_question_by_id(session, str(question_id))
+        assert session.get.await_args.args[1] == question_id
+
+        assert await QuestionService.get_question_by_id(session, "not-a-uuid") is None
+        assert session.get.await_count == 1
+
+    async def test_bulk_create_inserts_valid_rows_once(self):
+        """Test bulk create sends one INSERT and reports malformed rows."""
+        from services.question_service import QuestionService
+
+        question = {
+            "question_type": "VSA", "class_level": "X", "unit": "Algebra",
+            "question_text": "Solve x + 1 = 2", "marks": 2,
+        }
+        session = MagicMock()
+        session.scalars = AsyncMock()
+        session.scalars.return_value = MagicMock()
+        session.scalars.return_value.all.return_value = ["q1", "q2"]
+        session.commit = AsyncMock()
+
+        created, errors = await QuestionService.bulk_create_questions(
+            session, [question, {"question_text": "missing fields"}, question], str(uuid.uuid4())
+        )
+
+        assert created == ["q1", "q2"]
+        assert [e["index"] for e in errors] == [1]
+        assert session.scalars.await_count == 1
+        assert len(session.scalars.await_args.args[1]) == 2
+
+
 class TestEmailVerificationService:
     """Tests for email verification logic."""
 